@@ -26,7 +26,13 @@ from .salespricelistperiods import SalesPriceListPeriods
 from .salespricelists import SalesPriceLists
 from .salespricelistvolumediscounts import SalesPriceListVolumeDiscounts
 from .supplieritems import SupplierItems
+from .syncaccounts import SyncAccounts
+from .synccontacts import SyncContacts
+from .syncdeleted import SyncDeleted
+from .syncglaccounts import SyncGLAccounts
+from .syncitems import SyncItems
 from .syncsalesitemprices import SyncSalesItemPrices
+from .synctransactionlines import SyncTransactionLines
 from .vatcodes import VatCodes
 
 
@@ -54,5 +60,11 @@ class ExactApi(
     salespricelistvolumediscounts = SalesPriceListVolumeDiscounts.as_property()
     salespricelistperiods = SalesPriceListPeriods.as_property()
     supplieritems = SupplierItems.as_property()
+    syncaccounts = SyncAccounts.as_property()
+    synccontacts = SyncContacts.as_property()
+    syncdeleted = SyncDeleted.as_property()
+    syncglaccounts = SyncGLAccounts.as_property()
+    syncitems = SyncItems.as_property()
     syncsalesitemprices = SyncSalesItemPrices.as_property()
+    synctransactionlines = SyncTransactionLines.as_property()
     vatcodes = VatCodes.as_property()
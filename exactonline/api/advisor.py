@@ -0,0 +1,228 @@
+# vim: set ts=8 sw=4 sts=4 et ai tw=79:
+"""
+Find out which fields your code actually reads, so you can $select
+only those.
+
+Without a $select, Exact Online sends all fields of an entity, which
+can be well over a hundred. Set a SelectAdvisor on a manager (or on all
+of them) and the records it returns remember which fields were read:
+
+    from exactonline.api.advisor import SelectAdvisor
+    from exactonline.api.manager import Manager
+
+    advisor = SelectAdvisor()
+    Manager.select_advisor = advisor  # or api.invoices.select_advisor
+    ...  # run your code
+    print(advisor)
+
+That prints, per resource and call site (the first stack frame outside
+this library), the number of calls and records and the $select that
+would have sufficed:
+
+    crm/Accounts at run.py:42 (main): 3 calls, 90 records, read 2 of 96 fields
+        select='Code,Name'
+
+A field counts as read when it is accessed through record[field],
+record.get(field), `field in record` or, for compact records,
+record.field. Iterating over a record (or copying it, or dict(record))
+reads all of its fields. Reads that bypass the dict methods (like
+json.dumps of the record) are not seen.
+
+This is a debugging aid: the tracked records are copies of the
+originals, which costs time and memory.
+
+This file is part of the Exact Online REST API Library in Python
+(EORALP), licensed under the LGPLv3+.
+Copyright (C) 2021 Walter Doekes, OSSO B.V.
+"""
+import sys
+
+from collections import namedtuple
+from threading import Lock
+
+try:
+    from collections.abc import Mapping
+except ImportError:  # python2
+    from collections import Mapping
+
+
+class Advice(namedtuple(
+        'Advice', 'resource call_site calls records fields used key_field')):
+    """
+    The usage at one call site: fields holds the fields of the returned
+    records (in order), used the ones that were read.
+    """
+    __slots__ = ()
+
+    @property
+    def select(self):
+        """
+        The $select that would have sufficed: the fields that were read,
+        or only the key_field if none were.
+        """
+        return (
+            ','.join(i for i in self.fields if i in self.used) or
+            self.key_field)
+
+    def __str__(self):
+        return (
+            '%s at %s: %d calls, %d records, read %d of %d fields\n'
+            '    select=%r' % (
+                self.resource, self.call_site, self.calls, self.records,
+                len(self.used), len(self.fields), self.select))
+
+
+class SelectAdvisor(object):
+    """
+    Collects the field usage of the records returned by the managers
+    that have this advisor as select_advisor. See the module docs.
+
+    Call sites are the first stack frames in a module that does not
+    start with one of the skip prefixes.
+    """
+    def __init__(self, skip=('exactonline.',)):
+        self.skip = tuple(skip)
+        self._usage = {}  # (resource, call site) => _Usage
+        self._lock = Lock()
+
+    def __str__(self):
+        return '\n'.join(str(i) for i in self.report())
+
+    def track(self, manager, records):
+        """
+        Return tracking copies of the records (a list, or an iterator
+        for streamed pages). Called by the manager.
+        """
+        key = (manager.resource, self._call_site())
+        with self._lock:
+            usage = self._usage.get(key)
+            if usage is None:
+                usage = self._usage[key] = _Usage(manager.key_field)
+            usage.calls += 1
+
+        if isinstance(records, list):
+            return [usage.track(i) for i in records]
+        return (usage.track(i) for i in records)
+
+    def report(self):
+        """
+        Return an Advice per resource and call site, sorted.
+        """
+        with self._lock:
+            items = sorted(self._usage.items())
+        return [
+            Advice(
+                resource, call_site, usage.calls, usage.records,
+                tuple(usage.fields), frozenset(usage.used & usage.known),
+                usage.key_field)
+            for (resource, call_site), usage in items]
+
+    def reset(self):
+        with self._lock:
+            self._usage.clear()
+
+    def _call_site(self):
+        frame = sys._getframe(1)
+        while frame is not None:
+            if not frame.f_globals.get('__name__', '').startswith(self.skip):
+                return '%s:%d (%s)' % (
+                    frame.f_code.co_filename, frame.f_lineno,
+                    frame.f_code.co_name)
+            frame = frame.f_back
+        return '?'
+
+
+class _Usage(object):
+    def __init__(self, key_field):
+        self.key_field = key_field
+        self.calls = 0
+        self.records = 0
+        self.fields = []  # all fields seen, in record order
+        self.used = set()  # the ones that were read
+        self.known = set()
+
+    def track(self, record):
+        self.records += 1
+        for field in record:
+            if field not in self.known and not field.startswith('__'):
+                self.known.add(field)
+                self.fields.append(field)
+
+        if isinstance(record, dict):
+            return _TrackedDict(record, self.used)
+        return _TrackedRecord(record, self.used)
+
+
+class _TrackedDict(dict):
+    __slots__ = ('_used',)
+
+    def __init__(self, record, used):
+        super(_TrackedDict, self).__init__(record)
+        self._used = used
+
+    def __getitem__(self, key):
+        self._used.add(key)
+        return dict.__getitem__(self, key)
+
+    def __contains__(self, key):
+        self._used.add(key)
+        return dict.__contains__(self, key)
+
+    def __iter__(self):
+        self._read_all()
+        return dict.__iter__(self)
+
+    def get(self, key, default=None):
+        self._used.add(key)
+        return dict.get(self, key, default)
+
+    def copy(self):
+        self._read_all()
+        return dict(dict.items(self))
+
+    def items(self):
+        self._read_all()
+        return dict.items(self)
+
+    def keys(self):
+        self._read_all()
+        return dict.keys(self)
+
+    def values(self):
+        self._read_all()
+        return dict.values(self)
+
+    def _read_all(self):
+        self._used.update(dict.keys(self))
+
+
+class _TrackedRecord(Mapping):
+    """
+    Tracking proxy for a compact Record (see exactonline.records).
+    """
+    __slots__ = ('_record', '_used')
+
+    def __init__(self, record, used):
+        self._record = record
+        self._used = used
+
+    def __getitem__(self, key):
+        self._used.add(key)
+        return self._record[key]
+
+    def __getattr__(self, name):
+        if name in self.__slots__:
+            raise AttributeError(name)  # not set yet (copy, pickle)
+        if name in self._record:
+            self._used.add(name)
+        return getattr(self._record, name)
+
+    def __iter__(self):
+        self._used.update(self._record)
+        return iter(self._record)
+
+    def __len__(self):
+        return len(self._record)
+
+    def __repr__(self):
+        return repr(self._record)
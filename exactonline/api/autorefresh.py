@@ -6,6 +6,7 @@ This file is part of the Exact Online REST API Library in Python
 (EORALP), licensed under the LGPLv3+.
 Copyright (C) 2015-2021 Walter Doekes, OSSO B.V.
 """
+from threading import Lock
 from time import time
 
 from ..http import HTTPError
@@ -36,16 +37,26 @@ class Autorefresh(object):
 
     If we still get a 401, we'll _also_ do a token refresh and hope that the
     disagreement between us and the server gets resolved.
+
+    Concurrent requests (see api.workers) must not refresh at the same
+    time: the second refresh would be rejected for being too early. So
+    refreshing is done while holding a lock, and only if no other thread
+    has replaced the token in the mean time.
     """
+    _refresh_lock = Lock()
+
     def rest(self, request):
         # Check how much time we have left, and refresh token 30 seconds before
         # it expires.
         have_fresh_token = False
-        token_expiry = self.storage.get_access_expiry()
-        time_left_before_expiry = (token_expiry - time())
-        if time_left_before_expiry < 30:
-            self.refresh_token()
-            have_fresh_token = True
+        token = self.storage.get_access_token()
+        if self._token_expires_soon():
+            with self._refresh_lock:
+                # Another thread may have refreshed it in the mean time.
+                if self._token_expires_soon():
+                    self.refresh_token()
+                have_fresh_token = True
+                token = self.storage.get_access_token()
 
         try:
             decoded = super(Autorefresh, self).rest(request)
@@ -55,7 +66,11 @@ class Autorefresh(object):
                 # still valid, maybe we were wrong about the expiry
                 # time. (Maybe one of the clocks is off, maybe the
                 # remote side flushed the tokens.)
-                self.refresh_token()
+                with self._refresh_lock:
+                    # Unless another thread got a 401 as well, and has
+                    # refreshed it already.
+                    if self.storage.get_access_token() == token:
+                        self.refresh_token()
 
                 # Retry the call but don't catch additional 401s.
                 decoded = super(Autorefresh, self).rest(request)
@@ -64,3 +79,8 @@ class Autorefresh(object):
                 raise
 
         return decoded
+
+    def _token_expires_soon(self):
+        token_expiry = self.storage.get_access_expiry()
+        time_left_before_expiry = (token_expiry - time())
+        return time_left_before_expiry < 30
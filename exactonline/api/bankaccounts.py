@@ -7,6 +7,7 @@ This file is part of the Exact Online REST API Library in Python
 Copyright (C) 2018 Walter Doekes, OSSO B.V.
 """
 from .manager import Manager
+from .query import Guid, Q
 
 
 class BankAccounts(Manager):
@@ -14,8 +15,7 @@ class BankAccounts(Manager):
 
     def filter(self, account_id=None, **kwargs):
         if account_id is not None:
-            remote_id = self._remote_guid(account_id)
             # Filter by our account number.
-            self._filter_append(kwargs, u'Account eq %s' % (remote_id,))
+            self._filter_append(kwargs, Q(Account=Guid(account_id)))
 
         return super(BankAccounts, self).filter(**kwargs)
@@ -7,19 +7,20 @@ This file is part of the Exact Online REST API Library in Python
 Copyright (C) 2018 Walter Doekes, OSSO B.V.
 """
 from .manager import Manager
+from .query import Guid, Q
 
 
 class BulkSalesItemPrices(Manager):
     resource = 'bulk/Logistics/SalesItemPrices'
     # https://start.exactonline.co.uk/docs/HlpRestAPIResourcesDetails.aspx?
     #   name=BulkLogisticsSalesItemPrices
+    default_select = 'ID,Account,AccountName,Item,ItemCode,Price,Currency'
+    decimal_fields = ('Price',)
+    # No bulk/Resource(guid'...') addressing.
+    supports_key_lookup = False
 
     def filter(self, item_id=None, **kwargs):
-        if 'select' not in kwargs:
-            kwargs['select'] = (
-                'ID,Account,AccountName,Item,ItemCode,Price,Currency')
-
         if item_id:
-            self._filter_append(kwargs, f"Item eq {item_id}")
+            self._filter_append(kwargs, Q(Item=Guid(item_id)))
 
         return super().filter(**kwargs)
@@ -0,0 +1,148 @@
+# vim: set ts=8 sw=4 sts=4 et ai tw=79:
+"""
+Response caches for the managers.
+
+Reference data (VAT codes, ledger accounts, price lists) changes a few
+times a year, but is looked up all the time. Set a cache on a manager
+and its GET results are kept for cache_ttl seconds:
+
+    from exactonline.api.cache import MemoryCache, SqliteCache
+
+    api.vatcodes.cache = MemoryCache(max_entries=1000)
+    api.vatcodes.cache_ttl = 86400
+
+    # Or share the cache between processes.
+    api.ledgeraccounts.cache = SqliteCache('/var/cache/exact.sqlite')
+
+The results are keyed by division and resource URL. A create(),
+update() or delete() on the manager drops all cached results for its
+resource. Changes made elsewhere (in Exact itself, or by another
+program) show up when the TTL expires.
+
+A cache can be shared by several managers. The callers get their own
+copy of the cached records, so they can modify them freely.
+
+This file is part of the Exact Online REST API Library in Python
+(EORALP), licensed under the LGPLv3+.
+Copyright (C) 2021 Walter Doekes, OSSO B.V.
+"""
+import pickle
+import sqlite3
+
+from collections import OrderedDict
+from copy import deepcopy
+from threading import Lock
+from time import time
+
+
+class Cache(object):
+    """
+    Base class for the caches. Values are lists of records, or numbers.
+    """
+    def get(self, key):
+        """
+        Return the value for key, or None if it's not (or no longer)
+        cached.
+        """
+        raise NotImplementedError()
+
+    def set(self, key, value, ttl):
+        """
+        Store value for ttl seconds.
+        """
+        raise NotImplementedError()
+
+    def delete_prefix(self, prefix):
+        """
+        Drop all values with a key that starts with prefix.
+        """
+        raise NotImplementedError()
+
+
+class MemoryCache(Cache):
+    """
+    In-process cache. When it holds max_entries values, the least
+    recently used one is dropped.
+    """
+    def __init__(self, max_entries=1000):
+        self.max_entries = max_entries
+        self._data = OrderedDict()  # key => (expiry, value)
+        self._lock = Lock()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                expiry, value = self._data[key]
+            except KeyError:
+                return None
+            if expiry < time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+        return deepcopy(value)
+
+    def set(self, key, value, ttl):
+        value = deepcopy(value)
+        with self._lock:
+            self._data[key] = (time() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def delete_prefix(self, prefix):
+        with self._lock:
+            for key in [i for i in self._data if i.startswith(prefix)]:
+                del self._data[key]
+
+
+class SqliteCache(Cache):
+    """
+    Cache in an SQLite database, which can be shared by processes on
+    the same machine. When it holds max_entries values, the least
+    recently used ones are dropped.
+    """
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS cache (
+            key TEXT PRIMARY KEY,
+            expiry REAL NOT NULL,
+            used REAL NOT NULL,
+            value BLOB NOT NULL)'''
+
+    def __init__(self, filename, max_entries=10000):
+        self.max_entries = max_entries
+        self._conn = sqlite3.connect(
+            filename, timeout=30, check_same_thread=False,
+            isolation_level=None)  # autocommit
+        self._conn.execute(self.SCHEMA)
+        self._lock = Lock()
+
+    def get(self, key):
+        now = time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value FROM cache WHERE key = ? AND expiry >= ?',
+                (key, now)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                'UPDATE cache SET used = ? WHERE key = ?', (now, key))
+        return pickle.loads(row[0])
+
+    def set(self, key, value, ttl):
+        now = time()
+        value = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO cache VALUES (?, ?, ?, ?)',
+                (key, now + ttl, now, sqlite3.Binary(value)))
+            self._conn.execute(
+                'DELETE FROM cache WHERE expiry < ? OR key IN ('
+                ' SELECT key FROM cache ORDER BY used DESC LIMIT -1 OFFSET ?)',
+                (now, self.max_entries))
+
+    def delete_prefix(self, prefix):
+        # Not LIKE, because the prefix may hold % and _.
+        with self._lock:
+            self._conn.execute(
+                'DELETE FROM cache WHERE substr(key, 1, ?) = ?',
+                (len(prefix), prefix))
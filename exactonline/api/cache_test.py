@@ -0,0 +1,66 @@
+# vim: set ts=8 sw=4 sts=4 et ai tw=79:
+"""
+Response cache tests.
+
+This file is part of the Exact Online REST API Library in Python
+(EORALP), licensed under the LGPLv3+.
+Copyright (C) 2021 Walter Doekes, OSSO B.V.
+"""
+import os
+from tempfile import mkstemp
+from unittest import TestCase
+
+from .cache import MemoryCache, SqliteCache
+
+
+class CacheTestMixin(object):
+    def test_get_set(self):
+        cache = self.get_cache(max_entries=10)
+        self.assertIsNone(cache.get('1/crm/Accounts'))
+        cache.set('1/crm/Accounts', [{'ID': 'a'}], 60)
+        ret = cache.get('1/crm/Accounts')
+        self.assertEqual(ret, [{'ID': 'a'}])
+
+        # We get a copy.
+        ret[0]['ID'] = 'b'
+        self.assertEqual(cache.get('1/crm/Accounts'), [{'ID': 'a'}])
+
+    def test_ttl(self):
+        cache = self.get_cache(max_entries=10)
+        cache.set('1/crm/Accounts', 0, -1)
+        self.assertIsNone(cache.get('1/crm/Accounts'))
+
+    def test_lru(self):
+        cache = self.get_cache(max_entries=2)
+        cache.set('a', 1, 60)
+        cache.set('b', 2, 60)
+        cache.get('a')
+        cache.set('c', 3, 60)  # drops b, the least recently used
+        self.assertEqual(
+            [cache.get(i) for i in 'abc'], [1, None, 3])
+
+    def test_delete_prefix(self):
+        cache = self.get_cache(max_entries=10)
+        cache.set('1/crm/Accounts?$top=1', 1, 60)
+        cache.set("1/crm/Accounts(guid'a')", 2, 60)
+        cache.set('1/crm/Contacts', 3, 60)
+        cache.set('2/crm/Accounts', 4, 60)
+        cache.delete_prefix('1/crm/Accounts')
+        self.assertEqual(
+            [cache.get(i) for i in (
+                '1/crm/Accounts?$top=1', "1/crm/Accounts(guid'a')",
+                '1/crm/Contacts', '2/crm/Accounts')],
+            [None, None, 3, 4])
+
+
+class MemoryCacheTestCase(CacheTestMixin, TestCase):
+    def get_cache(self, **kwargs):
+        return MemoryCache(**kwargs)
+
+
+class SqliteCacheTestCase(CacheTestMixin, TestCase):
+    def get_cache(self, **kwargs):
+        fd, filename = mkstemp(suffix='.sqlite')
+        os.close(fd)
+        self.addCleanup(os.unlink, filename)
+        return SqliteCache(filename, **kwargs)
@@ -7,20 +7,21 @@ This file is part of the Exact Online REST API Library in Python
 Copyright (C) 2017 Walter Doekes, OSSO B.V.
 """
 from .manager import Manager
+from .query import Q
 
 
 class Contacts(Manager):
     resource = 'crm/Contacts'
+    bulk_resource = 'bulk/CRM/Contacts'
+    default_select = 'ID,Code,FirstName,MiddleName,LastName'
+    entity_type = 5  # in sync/Deleted
+    date_fields = ('BirthDate', 'Created', 'EndDate', 'Modified', 'StartDate')
 
     def filter(self, relation_code=None, **kwargs):
-        # $select=ID,Code,Name
-        if 'select' not in kwargs:
-            kwargs['select'] = 'ID,Code,FirstName,MiddleName,LastName'
-
         if relation_code is not None:
-            remote_id = self._remote_contact_code(relation_code)
-            self._filter_append(kwargs, u'Code eq %s' % (remote_id,))
+            remote_code = self._remote_contact_code(relation_code)
+            self._filter_append(kwargs, Q(Code=remote_code))
         return super(Contacts, self).filter(**kwargs)
 
     def _remote_contact_code(self, code):
-        return u"'%18s'" % (code.replace("'", "''"),)
+        return u'%18s' % (code,)
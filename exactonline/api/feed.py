@@ -0,0 +1,198 @@
+# vim: set ts=8 sw=4 sts=4 et ai tw=79:
+"""
+Poll for changes once, and hand them to every interested party.
+
+If several parts of a program poll the same resource for changes, they
+pay for the same API calls several times. A ChangeFeed polls every
+source once per interval and delivers the changed records to all the
+callbacks that subscribed to it:
+
+    from exactonline.api.feed import ChangeFeed, ModifiedSince
+
+    feed = ChangeFeed(interval=300)
+    feed.subscribe(api.syncitems, update_webshop)
+    feed.subscribe(api.syncitems, update_search_index)
+    feed.subscribe(api.syncsalesitemprices, update_prices)
+    feed.subscribe(ModifiedSince(api.invoices), notify_sales)
+    feed.run()  # or call feed.poll() from your own scheduler
+
+The sources are SyncManagers (see api.sync), which keep their cursor in
+the storage: after a restart, the callbacks get what they missed. For
+a resource without a sync/ counterpart, ModifiedSince polls the manager
+on its Modified field; it starts at the latest change and keeps its
+cursor in memory.
+
+The callbacks get the records in batches: a list per page, or at most
+batch_size records. They all get the same records, so they should not
+modify them. A callback that raises is logged and does not stop the
+others; its batch is not delivered again.
+
+This file is part of the Exact Online REST API Library in Python
+(EORALP), licensed under the LGPLv3+.
+Copyright (C) 2021 Walter Doekes, OSSO B.V.
+"""
+import logging
+
+from datetime import timedelta
+from threading import Event, Lock
+from time import time
+
+from ..dates import EPOCH, decode_date
+from .query import Q, as_q
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeFeed(object):
+    """
+    Polls sources for changes and fans them out to callbacks. See the
+    module docs.
+    """
+    def __init__(self, interval=300, batch_size=None):
+        self.interval = interval
+        self.batch_size = batch_size
+        self._sources = []  # [source, kwargs, callbacks]
+        self._lock = Lock()
+        self._stop = Event()
+
+    def subscribe(self, source, callback, **kwargs):
+        """
+        Call callback(records) with the changes of source. The kwargs
+        (like select, or filter and name) are passed to source.sync();
+        all subscriptions to a source must use the same.
+        """
+        with self._lock:
+            for source_, kwargs_, callbacks in self._sources:
+                if source_ is source:
+                    if kwargs_ != kwargs:
+                        raise ValueError(
+                            'Source %r is already polled with %r' % (
+                                source, kwargs_))
+                    callbacks.append(callback)
+                    return
+            self._sources.append([source, kwargs, [callback]])
+
+    def unsubscribe(self, source, callback):
+        with self._lock:
+            for entry in self._sources:
+                if entry[0] is source and callback in entry[2]:
+                    entry[2].remove(callback)
+                    if not entry[2]:
+                        self._sources.remove(entry)
+                    return
+
+    def poll(self):
+        """
+        Fetch the changes of every source once and deliver them.
+        Returns the number of changed records. A source that fails is
+        logged, and does not keep the others from being polled.
+        """
+        with self._lock:
+            sources = [
+                (source, kwargs, list(callbacks))
+                for source, kwargs, callbacks in self._sources]
+
+        count = 0
+        for source, kwargs, callbacks in sources:
+            try:
+                count += source.sync(
+                    (lambda records: self._deliver(records, callbacks)),
+                    **kwargs)
+            except Exception:
+                logger.exception('Polling %r for changes failed', source)
+        return count
+
+    def run(self):
+        """
+        Poll every interval seconds, until stop() is called. A failing
+        poll (think network trouble) is logged and retried next time.
+        """
+        while not self._stop.is_set():
+            started = time()
+            try:
+                self.poll()
+            except Exception:
+                logger.exception('Polling for changes failed')
+            self._stop.wait(max(0, self.interval - (time() - started)))
+
+    def stop(self):
+        self._stop.set()
+
+    def _deliver(self, records, callbacks):
+        size = self.batch_size or len(records)
+        for start in range(0, len(records), size):
+            batch = records[start:start + size]
+            for callback in callbacks:
+                try:
+                    callback(batch)
+                except Exception:
+                    logger.exception(
+                        'Change callback %r failed on %d records',
+                        callback, len(batch))
+
+
+class ModifiedSince(object):
+    """
+    Change source for a manager without a sync/ resource: it asks for
+    the records with field (Modified) at or after the latest change it
+    has seen. The first sync() only looks up that latest change; if
+    there are no records yet, it starts at the time of that sync().
+    """
+    def __init__(self, manager, field='Modified'):
+        self.manager = manager
+        self.field = field
+        self.cursor = None  # the latest change seen
+        self._seen = set()  # the keys of the records changed at cursor
+
+    def sync(self, apply, name=None, **kwargs):
+        """
+        Call apply(records) for every page of records changed since the
+        previous sync(). Returns the number of records. The name is
+        accepted like SyncManager.sync() does; the cursor is kept per
+        ModifiedSince anyway.
+        """
+        key_field = self.manager.key_field
+        if self.cursor is None:
+            now = EPOCH + timedelta(seconds=int(time()))
+            latest = self.manager.filter(
+                top=1, orderby='%s desc' % (self.field,),
+                select='%s,%s' % (key_field, self.field))
+            self._advance(latest)
+            if self.cursor is None:
+                self.cursor = now  # nothing yet, everything after is new
+            return 0
+
+        if kwargs.get('select'):
+            select = kwargs['select'].split(',')
+            kwargs['select'] = ','.join(
+                [i for i in (key_field, self.field) if i not in select] +
+                select)
+        since = Q(**{'%s__ge' % (self.field,): self.cursor})
+        kwargs['filter'] = (
+            as_q(kwargs['filter']) & since if 'filter' in kwargs else since)
+
+        # The filter is on whole seconds, and includes the cursor: skip
+        # what we have seen already.
+        changed = []
+        for page in self.manager.filter(pages=True, **kwargs):
+            page = [i for i in page if self._is_new(i)]
+            if page:
+                apply(page)
+                changed.extend(page)
+        self._advance(changed)
+        return len(changed)
+
+    def _is_new(self, record):
+        modified = decode_date(record[self.field])
+        return modified > self.cursor or (
+            modified == self.cursor and
+            record[self.manager.key_field] not in self._seen)
+
+    def _advance(self, records):
+        for record in records:
+            modified = decode_date(record[self.field])
+            if self.cursor is None or modified > self.cursor:
+                self.cursor = modified
+                self._seen = set()
+            if modified == self.cursor:
+                self._seen.add(record[self.manager.key_field])
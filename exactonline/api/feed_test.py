@@ -0,0 +1,125 @@
+# vim: set ts=8 sw=4 sts=4 et ai tw=79:
+"""
+Change feed tests.
+
+This file is part of the Exact Online REST API Library in Python
+(EORALP), licensed under the LGPLv3+.
+Copyright (C) 2021 Walter Doekes, OSSO B.V.
+"""
+from unittest import TestCase
+try:
+    from urllib.parse import unquote
+except ImportError:  # python2
+    from urllib import unquote
+
+from .. import api_test
+from ..api_test import RecordingApi
+from .feed import ChangeFeed, ModifiedSince
+from .items import Items
+from .syncitems import SyncItems
+
+
+class ChangeFeedTestCase(TestCase):
+    def test_fan_out(self):
+        api = RecordingApi(
+            [{'Timestamp': 5, 'ID': 'a'}, {'Timestamp': 7, 'ID': 'b'}],
+            [{'Timestamp': 9, 'ID': 'c'}])
+        api.storage = api_test.ApiTestCase.MemoryStorage(server_port=0)
+        syncitems = SyncItems(api)
+
+        first, second = [], []
+
+        def broken(records):
+            raise ValueError('boom')
+
+        feed = ChangeFeed(batch_size=1)
+        feed.subscribe(syncitems, first.append, select='ID')
+        feed.subscribe(syncitems, broken, select='ID')
+        feed.subscribe(syncitems, second.append, select='ID')
+        self.assertRaises(
+            ValueError, feed.subscribe, syncitems, first.append)
+
+        with self.assertLogs('exactonline.api.feed', 'ERROR') as logs:
+            self.assertEqual(feed.poll(), 3)
+        self.assertEqual(len(logs.output), 3)  # a batch per record
+        self.assertEqual(len(api.requests), 1)  # one call for everyone
+        self.assertEqual([i[0]['ID'] for i in first], ['a', 'b', 'c'])
+        self.assertEqual(first, second)
+        self.assertEqual(syncitems.get_cursor(), 9)
+
+        feed.unsubscribe(syncitems, broken)
+        api.results = [[{'Timestamp': 11, 'ID': 'a'}]]
+        self.assertEqual(feed.poll(), 1)
+        self.assertIn('Timestamp gt 9', unquote(api.requests[-1].resource))
+        self.assertEqual(len(second), 4)
+
+    def test_failing_source(self):
+        class Broken(object):
+            def sync(self, apply):
+                raise IOError('network trouble')
+
+        class Working(object):
+            def sync(self, apply):
+                apply([{'ID': 'a'}])
+                return 1
+
+        changed = []
+        feed = ChangeFeed()
+        feed.subscribe(Broken(), changed.extend)
+        feed.subscribe(Working(), changed.extend)
+        with self.assertLogs('exactonline.api.feed', 'ERROR') as logs:
+            self.assertEqual(feed.poll(), 1)
+        self.assertEqual(len(logs.output), 1)
+        self.assertEqual(changed, [{'ID': 'a'}])
+
+    def test_run_stop(self):
+        feed = ChangeFeed(interval=0)
+
+        class Source(object):
+            def sync(self, apply):
+                feed.stop()
+                return 0
+
+        feed.subscribe(Source(), None)
+        feed.run()  # returns after the poll stopped it
+
+    def test_modified_since(self):
+        modified = '/Date(1516741035800)/'
+        later = '/Date(1516741035900)/'
+        api = RecordingApi([{'ID': 'a', 'Modified': modified}])
+        source = ModifiedSince(Items(api))
+        changed = []
+
+        # The first call only looks for the latest change.
+        self.assertEqual(source.sync(changed.extend), 0)
+        self.assertIn(
+            '$orderby=Modified desc', unquote(api.requests[-1].resource))
+
+        api.results = [
+            [{'ID': 'a', 'Modified': modified},
+             {'ID': 'b', 'Modified': later}]]
+        self.assertEqual(source.sync(changed.extend, select='Code'), 1)
+        self.assertEqual(changed, [{'ID': 'b', 'Modified': later}])
+        self.assertIn(
+            "$select=ID,Modified,Code&$filter=Modified ge "
+            "datetime'2018-01-23T20:57:15'",
+            unquote(api.requests[-1].resource))
+
+        # Seen at the cursor: skipped.
+        api.results = [
+            [{'ID': 'a', 'Modified': modified},
+             {'ID': 'b', 'Modified': later},
+             {'ID': 'c', 'Modified': later}]]
+        self.assertEqual(source.sync(changed.extend), 1)
+        self.assertEqual(changed[-1]['ID'], 'c')
+
+    def test_modified_since_empty(self):
+        # No records at all: start now, instead of looking again.
+        api = RecordingApi([])
+        source = ModifiedSince(Items(api))
+        self.assertEqual(source.sync(list), 0)
+        self.assertIsNotNone(source.cursor)
+
+        api.results = [[{'ID': 'a', 'Modified': '/Date(4102444800000)/'}]]
+        self.assertEqual(source.sync(list), 1)
+        self.assertIn('Modified ge', unquote(api.requests[-1].resource))
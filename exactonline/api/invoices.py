@@ -7,11 +7,16 @@ This file is part of the Exact Online REST API Library in Python
 Copyright (C) 2015-2017 Walter Doekes, OSSO B.V.
 """
 from .manager import Manager
+from .query import Q
 from ..resource import GET
 
 
 class Invoices(Manager):
     resource = 'salesentry/SalesEntries'
+    key_field = 'EntryID'
+    date_fields = ('Created', 'DueDate', 'EntryDate', 'Modified')
+    # Also in the SalesEntryLines, which get() decodes the same way.
+    decimal_fields = ('AmountDC', 'AmountFC', 'VATAmountDC', 'VATAmountFC')
 
     def get(self, **kwargs):
         invoice_dict = super(Invoices, self).get(**kwargs)
@@ -21,16 +26,16 @@ class Invoices(Manager):
             # Perhaps there is a 'select' filter.
             pass
         else:
-            invoicelines_dict = self._api.restv1(GET(str(uri)))
+            invoicelines_dict = self._api.restv1(
+                GET(str(uri), decoder=self._get_decoder(None)))
             invoice_dict[u'SalesEntryLines'] = invoicelines_dict
         return invoice_dict
 
     def filter(self, invoice_number=None, invoice_number__in=None,
                reporting_period=None, **kwargs):
         if invoice_number is not None:
-            remote_id = self._remote_invoice_number(invoice_number)
             # Filter by our invoice_number.
-            self._filter_append(kwargs, u'YourRef eq %s' % (remote_id,))
+            self._filter_append(kwargs, Q(YourRef=invoice_number))
             # # Let the query return the invoice lines too. <-- DOES NOT WORK
             # assert 'expand' not in kwargs
             # kwargs['expand'] = 'SalesInvoiceLines'
@@ -38,21 +43,18 @@ class Invoices(Manager):
             #                     'SalesInvoiceLines/Amount,'
             #                     'SalesInvoiceLines/VATAmount')
 
-        if invoice_number__in is not None:
-            # Filter by any of the supplied invoice numbers.
-            remote_filter = []
-            for invoice_number in invoice_number__in:
-                remote_id = self._remote_invoice_number(invoice_number)
-                remote_filter.append(u'YourRef eq %s' % (remote_id,))
-            self._filter_append(
-                kwargs, u'(%s)' % (u' or '.join(remote_filter),))
-
         if reporting_period is not None:
             # Filter by reporting period.
-            self._filter_append(
-                kwargs, u'ReportingYear eq %d' % (reporting_period.year,))
-            self._filter_append(
-                kwargs, u'ReportingPeriod eq %d' % (reporting_period.month,))
+            self._filter_append(kwargs, Q(
+                ReportingYear=reporting_period.year,
+                ReportingPeriod=reporting_period.month))
+
+        if invoice_number__in is not None:
+            # Filter by any of the supplied invoice numbers. Split up
+            # in as many queries as needed.
+            return self._filter_in(
+                super(Invoices, self).filter, 'YourRef', invoice_number__in,
+                kwargs)
 
         return super(Invoices, self).filter(**kwargs)
 
@@ -69,20 +71,15 @@ class Invoices(Manager):
             return dict((i['InvoiceNumber'], i['YourRef']) for i in ret)
 
         # Slower, select what we want to know. More work for us.
-        exact_to_foreign_map = {}
-
-        # Do it in batches. If we append 300 InvoiceNumbers at once, we
-        # get a 12kB URI. (If the list is empty, we skip the entire
-        # forloop and correctly return the empty dict.)
+        # filter_in() does the batching (and skips the query if the list
+        # is empty, returning the empty dict).
         exact_invoice_numbers = list(set(exact_invoice_numbers))  # unique
-        for offset in range(0, len(exact_invoice_numbers), 40):
-            batch = exact_invoice_numbers[offset:(offset + 40)]
-            filter_ = ' or '.join(
-                'InvoiceNumber eq %s' % (i,) for i in batch)
-            assert filter_  # if filter was empty, we'd get all!
-            ret = self.filter(filter=filter_, select='InvoiceNumber,YourRef')
-            exact_to_foreign_map.update(
-                dict((i['InvoiceNumber'], i['YourRef']) for i in ret))
+        ret = self.filter_in(
+            # InvoiceNumber is an integer, don't quote it.
+            'InvoiceNumber', [int(i) for i in exact_invoice_numbers],
+            select='InvoiceNumber,YourRef')
+        exact_to_foreign_map = dict(
+            (i['InvoiceNumber'], i['YourRef']) for i in ret)
 
         # Any values we missed?
         for exact_invoice_number in exact_invoice_numbers:
@@ -104,21 +101,12 @@ class Invoices(Manager):
             return dict((i['YourRef'], i['InvoiceNumber']) for i in ret)
 
         # Slower, select what we want to know. More work for us.
-        foreign_to_exact_map = {}
-
-        # Do it in batches. If we append 300 InvoiceNumbers at once, we
-        # get a 12kB URI. (If the list is empty, we skip the entire
-        # forloop and correctly return the empty dict.)
         foreign_invoice_numbers = list(set(foreign_invoice_numbers))  # unique
-        for offset in range(0, len(foreign_invoice_numbers), 40):
-            batch = foreign_invoice_numbers[offset:(offset + 40)]
-            filter_ = ' or '.join(
-                'YourRef eq %s' % (self._remote_invoice_number(i),)
-                for i in batch)
-            assert filter_  # if filter was empty, we'd get all!
-            ret = self.filter(filter=filter_, select='InvoiceNumber,YourRef')
-            foreign_to_exact_map.update(
-                dict((i['YourRef'], i['InvoiceNumber']) for i in ret))
+        ret = self.filter_in(
+            'YourRef', foreign_invoice_numbers,
+            select='InvoiceNumber,YourRef')
+        foreign_to_exact_map = dict(
+            (i['YourRef'], i['InvoiceNumber']) for i in ret)
 
         # Any values we missed?
         for foreign_invoice_number in foreign_invoice_numbers:
@@ -126,6 +114,3 @@ class Invoices(Manager):
                 foreign_to_exact_map[foreign_invoice_number] = None
 
         return foreign_to_exact_map
-
-    def _remote_invoice_number(self, invoice_number):
-        return u"'%s'" % (invoice_number.replace("'", "''"),)
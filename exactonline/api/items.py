@@ -7,26 +7,28 @@ This file is part of the Exact Online REST API Library in Python
 Copyright (C) 2018 Walter Doekes, OSSO B.V.
 """
 from .manager import Manager
+from .query import Q
 
 
 class Items(Manager):
     # https://start.exactonline.co.uk/docs/HlpRestAPIResourcesDetails.aspx?
     #   name=LogisticsItems
     resource = 'logistics/Items'
+    bulk_resource = 'bulk/Logistics/Items'
+    default_select = 'ID,Code,CostPriceStandard,Description'
+    entity_type = 9  # in sync/Deleted
+    date_fields = ('Created', 'EndDate', 'Modified', 'StartDate')
+    decimal_fields = ('CostPriceNew', 'CostPriceStandard')
 
     def filter(self, code=None, modified_since_date=None, **kwargs):
         if code and modified_since_date:
             raise ValueError(
                 'You can only filter on either code, or modified_since_date')
 
-        if 'select' not in kwargs:
-            kwargs['select'] = 'ID,Code,CostPriceStandard,Description'
-
         if code is not None:
-            self._filter_append(kwargs, f"Code eq '{code}'")
+            self._filter_append(kwargs, Q(Code=code))
 
         if modified_since_date:
-            datestring = modified_since_date.strftime('%Y-%m-%d')
-            self._filter_append(kwargs, f"Modified gt datetime'{datestring}'")
+            self._filter_append(kwargs, Q(Modified__gt=modified_since_date))
 
         return super().filter(**kwargs)
@@ -11,19 +11,12 @@ from .manager import Manager
 
 class LedgerAccounts(Manager):
     resource = 'financial/GLAccounts'
+    bulk_resource = 'bulk/Financial/GLAccounts'
+    default_select = 'ID,Code'
+    entity_type = 7  # in sync/Deleted
 
     def filter(self, code__in=None, **kwargs):
-        # $select=ID,Code,Name
-        if 'select' not in kwargs:
-            kwargs['select'] = 'ID,Code'
-
         if code__in is not None:
-            code_filter = []
-            for code in code__in:
-                code = self._remote_code(code)
-                code_filter.append(u'Code eq %s' % (code,))
-            self._filter_append(kwargs, u'(%s)' % (u' or '.join(code_filter),))
+            return self._filter_in(
+                super(LedgerAccounts, self).filter, 'Code', code__in, kwargs)
         return super(LedgerAccounts, self).filter(**kwargs)
-
-    def _remote_code(self, code):
-        return u"'%s'" % (code.replace("'", "''"),)
@@ -0,0 +1,88 @@
+# vim: set ts=8 sw=4 sts=4 et ai tw=79:
+"""
+Per-call budgets for paginated GET requests.
+
+The iteration_limit from the config is a blunt safety net: it counts
+pages, whatever their size, and raises an error when it is reached,
+throwing away the pages fetched so far. Limits are checked between the
+pages instead; when one is reached, the call returns what it has and
+leaves a continuation to pick up where it stopped.
+
+Usage:
+
+    limits = Limits(records=5000, seconds=60)
+    relations = api.relations.filter(limits=limits)
+    while limits.continuation:
+        relations.extend(api.relations.resume(limits.continuation))
+
+The limits are soft: they stop the next page from being fetched, so
+you may get up to a page more records (or bytes) than asked for.
+
+This file is part of the Exact Online REST API Library in Python
+(EORALP), licensed under the LGPLv3+.
+Copyright (C) 2021 Walter Doekes, OSSO B.V.
+"""
+from time import time
+
+
+class Limits(object):
+    """
+    Limit a call by records, bytes downloaded, wall time in seconds
+    and/or API calls. Unset (None) limits are not checked.
+
+    After the call, reached holds the name of the limit that was
+    reached (or None), and continuation holds the GET request for the
+    next page (or None if everything was fetched).
+
+    When the request is passed again, all counters are reset.
+    """
+    NAMES = ('records', 'bytes', 'seconds', 'calls')
+
+    def __init__(self, records=None, bytes=None, seconds=None, calls=None):
+        self.max_records = records
+        self.max_bytes = bytes
+        self.max_seconds = seconds
+        self.max_calls = calls
+        self.start()
+
+    def __repr__(self):
+        return '<Limits(%s)>' % (', '.join(
+            '%s=%s/%s' % (name, self._used(name), self._max(name))
+            for name in self.NAMES if self._max(name) is not None),)
+
+    def start(self):
+        self.records = 0
+        self.bytes = 0
+        self.calls = 0
+        self.started = time()
+        self.reached = None
+        self.continuation = None
+
+    def add_page(self, records):
+        self.calls += 1
+        self.records += records
+
+    def add_bytes(self, bytes):
+        self.bytes += bytes
+
+    def check(self):
+        """
+        Return the name of the first limit that was reached, or None.
+        """
+        for name in self.NAMES:
+            max_ = self._max(name)
+            if max_ is not None and self._used(name) >= max_:
+                return name
+        return None
+
+    def stop(self, reached, continuation):
+        self.reached = reached
+        self.continuation = continuation
+
+    def _max(self, name):
+        return getattr(self, 'max_' + name)
+
+    def _used(self, name):
+        if name == 'seconds':
+            return time() - self.started
+        return getattr(self, name)
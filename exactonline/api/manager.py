@@ -6,9 +6,24 @@ This file is part of the Exact Online REST API Library in Python
 (EORALP), licensed under the LGPLv3+.
 Copyright (C) 2015-2018 Walter Doekes, OSSO B.V.
 """
+import logging
+import re
+
+from threading import Lock
+from time import sleep, time
+
+from .. import columns
 from ..exceptions import MultipleObjectsReturned, ObjectDoesNotExist
-from ..http import binquote
+from ..http import HTTPError
+from ..dates import decode_date, decode_dates
+from ..decoder import Decoder
+from ..records import to_records
 from ..resource import DELETE, GET, POST, PUT
+from .query import Guid, Q, as_q, cached_binquote
+from .queryset import QuerySet
+from .workers import max_workers_for, run_concurrently, run_each
+
+logger = logging.getLogger(__name__)
 
 
 # Python23 compatibility helpers
@@ -21,6 +36,9 @@ else:
     to_binstr = str
     to_unistr = unicode  # noqa: non-str-to-unistr
 
+# "ID eq guid'...'", the filter that get() translates to a direct lookup.
+_KEY_LOOKUP = re.compile(r"^(\w+) eq guid'([0-9A-Fa-f-]+)'$")
+
 
 class Manager(object):
     """
@@ -38,6 +56,64 @@ class Manager(object):
         api.relations.all()
     """
     resource = None  # set this in your subclass
+    # The $select used by filter() and get() if you pass none. Without
+    # one, all fields are returned.
+    default_select = None
+    # Optional bulk/ counterpart of the resource. Those return 1000
+    # records per page instead of 60. They are used automatically for
+    # plain $select/$filter queries, see _resource_for().
+    bulk_resource = None
+    # Optional JSONDecoder for the responses, see exactonline.decoder.
+    # Can be overridden per call with filter(decoder=...).
+    decoder = None
+    # Return compact Records instead of dicts, see exactonline.records.
+    compact_records = False
+    # The fields holding /Date(...)/ values. If parse_dates is set,
+    # they are decoded to datetimes, see exactonline.dates.
+    date_fields = ()
+    parse_dates = False
+    # The fields holding amounts. If parse_decimals is set (and there is
+    # no decoder), they are decoded to Decimal, see exactonline.decoder.
+    decimal_fields = ()
+    parse_decimals = False
+    # The GUID field that uniquely identifies a record. Used by
+    # in_bulk() and to deduplicate the results of filter_in().
+    key_field = 'ID'
+    # Whether get() may address a record directly, as resource(guid'..'),
+    # when it only filters on the key_field. The bulk/ and sync/
+    # resources don't support that.
+    supports_key_lookup = True
+    # filter_in() splits its values into chunks so the resource path and
+    # query string ($select, $filter, ...) stay below this length, and
+    # fetches up to max_workers chunks at the same time. Leave room for
+    # the base URL.
+    max_url_length = 2000
+    max_workers = 4
+    # Optional cache for the GET results, see api.cache. The results
+    # are kept for cache_ttl seconds, or until a create/update/delete.
+    cache = None
+    cache_ttl = 300
+    # If set, get() remembers for this many seconds which lookups raised
+    # ObjectDoesNotExist, and raises it again without asking. A create()
+    # or update() forgets them.
+    negative_cache_ttl = None
+    # The bulk_*() calls retry temporary failures (rate limited, server
+    # errors) up to max_retries times, waiting retry_delay seconds and
+    # doubling that every time. Creates are only retried when rate
+    # limited: after a server error, we can't know that nothing was
+    # created.
+    max_retries = 3
+    retry_delay = 2
+    retry_codes = (429, 500, 502, 503, 504)
+    # Optional SelectAdvisor, which tracks the fields that are read
+    # from the returned records, see api.advisor.
+    select_advisor = None
+    # Optional Mirror, which answers simple lookups from a local copy,
+    # see api.mirror.
+    mirror = None
+    # The EntityType of the records in the sync/Deleted resource, if
+    # any. See api.syncdeleted.
+    entity_type = None
 
     @classmethod
     def as_property(cls):
@@ -52,14 +128,44 @@ class Manager(object):
 
     def __init__(self, api):
         self._api = api
+        self._missing = {}  # negative cache: get() kwargs => expiry
+        self._key_indexes = {}  # (division, field) => {natural key: GUID}
+        self._key_guids = {}  # (division, field) => {lower GUID: key}
+        self._key_lock = Lock()  # for both, bulk calls run in threads
+        self._decimal_decoder = None
 
     # == GET / get one / get many ==
 
-    def all(self):
+    def all(self, lazy=False):
         # Select all without filtering.
-        return self.filter()
+        return self.filter(lazy=lazy)
 
     def get(self, **kwargs):
+        if not self.negative_cache_ttl:
+            return self._get(**kwargs)
+
+        key = self._negative_cache_key(kwargs)
+        expiry = self._missing.get(key)
+        if expiry is not None:
+            if expiry > time():
+                raise ObjectDoesNotExist()
+            self._missing.pop(key, None)
+
+        try:
+            return self._get(**kwargs)
+        except ObjectDoesNotExist:
+            self._negative_cache_prune()
+            self._missing[key] = time() + self.negative_cache_ttl
+            raise
+
+    def _get(self, **kwargs):
+        # With only a key_field filter (and maybe a select), address
+        # the record directly. That's cheaper than a $top=2 query.
+        guid = self._get_key_lookup(kwargs)
+        if guid is not None and self.mirror is None:
+            return self.get_by_id(
+                guid, select=kwargs.get('select', self.default_select))
+
         assert 'top' not in kwargs
         ret = self.filter(top=2, **kwargs)
         if not ret:
@@ -68,24 +174,217 @@ class Manager(object):
             raise MultipleObjectsReturned()
         return ret[0]
 
-    def filter(self, **kwargs):
+    def get_by_id(self, guid, select=None, decoder=None):
+        """
+        Return the record with this GUID, by addressing it directly:
+        resource(guid'...'). Raises ObjectDoesNotExist if there is none.
+        The select defaults to the default_select.
+        """
+        if select is None:
+            select = self.default_select
+        uri = '%s(%s)' % (self.resource, self._remote_guid(guid))
+        if select:
+            uri += '?$select=' + cached_binquote(to_unistr(select))
+
+        request = GET(
+            str(uri), decoder=self._get_decoder(decoder), entity=True)
+        try:
+            ret = self._restv1_cached(request)
+        except HTTPError as e:
+            if e.code == 404:
+                raise ObjectDoesNotExist()
+            raise
+        if not ret:
+            raise ObjectDoesNotExist()
+        return self._records(ret)[0]
+
+    def in_bulk(self, guids, select=None, **kwargs):
+        """
+        Return a dict of GUID to record for the records with these
+        GUIDs (in key_field). GUIDs that are not found are left out.
+
+        The lookups are batched by filter_in(), so fetching 1000
+        records costs a few dozen calls instead of 1000.
+        """
+        guids = list(guids)
+        if select:
+            if self.key_field not in select.split(','):
+                select = '%s,%s' % (self.key_field, select)
+            kwargs['select'] = select
+
+        # Exact returns lowercase GUIDs; we may have gotten uppercase.
+        records = self.filter_in(
+            self.key_field, [Guid(str(i).lower()) for i in guids], **kwargs)
+        by_guid = dict((i[self.key_field].lower(), i) for i in records)
+
+        ret = {}
+        for guid in guids:
+            record = by_guid.get(str(guid).lower())
+            if record is not None:
+                ret[guid] = record
+        return ret
+
+    def count(self, **kwargs):
+        """
+        Return the number of records matching the query in kwargs,
+        without fetching them.
+        """
+        return self.filter(count=True, **kwargs)
+
+    def exists(self, **kwargs):
+        """
+        Return whether there are records matching the query in kwargs,
+        by fetching at most the key_field of one. A top or select in
+        kwargs is ignored.
+        """
+        kwargs.pop('top', None)
+        kwargs.pop('select', None)
+        return bool(self.filter(top=1, select=self.key_field, **kwargs))
+
+    def filter(self, lazy=False, **kwargs):
+        """
+        Return a list of records matching the query in kwargs.
+
+        If lazy is set, return a QuerySet (see api.queryset) instead,
+        which only queries the API when it is evaluated. Slicing it sets
+        $top and $skip.
+
+        If pages is set, return a generator that yields the records one
+        page at a time instead. Memory use is then bounded by the size
+        of a single page, regardless of the size of the resultset.
+
+        The decoder (or the decoder set on the manager) is used to parse
+        the JSON responses. If limits (see api.limits) are passed, they
+        replace the iteration_limit and may stop the call early. Use
+        resume() to fetch the rest.
+
+        If count is set, return the number of matching records instead
+        (using resource/$count). See count().
+        """
+        if 'select' not in kwargs and self.default_select:
+            kwargs['select'] = self.default_select
+        if lazy:
+            # The QuerySet decides on pages and counts by itself.
+            kwargs.pop('pages', None)
+            kwargs.pop('count', None)
+            return QuerySet(self, kwargs)
+        return self._filter(**kwargs)
+
+    def _filter(self, pages=False, decoder=None, limits=None, count=False,
+                **kwargs):
+        filter_ = kwargs.get('filter')
+        if isinstance(filter_, Q) and filter_.matches_nothing():
+            # No need to ask, like for an empty __in.
+            if count:
+                return 0
+            return iter([]) if pages else []
+
+        if self.mirror is not None and not (pages or limits or count):
+            ret = self.mirror.lookup(self, kwargs)
+            if ret is not None:
+                return self._records(ret)
+
+        if count:
+            kwargs.pop('select', None)  # we're not getting any fields
+        args = self._query_args(kwargs)
+
+        if count:
+            return self._restv1_cached(GET(self.resource + '/$count' + args))
+
+        resource = self._resource_for(kwargs)
+        request = GET(
+            resource + args, decoder=self._get_decoder(decoder), limits=limits)
+        if pages:
+            return self._filter_pages(self._api.restv1_pages(request))
+
+        ret = self._restv1_cached(request)
+        return self._records(ret)
+
+    def _query_args(self, kwargs):
+        """
+        Return the URL query string (with the ?) for the kwargs.
+        """
         # kwargs = {'filter': "Created+gt+datetime'2014-01-01'", 'top': 5}
+        # or {'filter': Q(Created__gt=date(2014, 1, 1)), 'top': 5}
         args = []
         for key, value in kwargs.items():
-            args.append('$%s=%s' % (
-                key, binquote(to_unistr(value))))
+            if isinstance(value, Q):
+                value = value.encode()
+            else:
+                value = cached_binquote(to_unistr(value))
+            args.append('$%s=%s' % (key, value))
         if args:
-            args = ('?' + '&'.join(args))
-        else:
-            args = ''
+            return '?' + '&'.join(args)
+        return ''
 
-        ret = self._api.restv1(GET(self.resource + args))
-        return ret
+    def resume(self, continuation, pages=False):
+        """
+        Continue a filter() that stopped because it reached its limits.
+        Pass it the limits.continuation. The same limits apply again.
+        """
+        # The continuation holds the full URL, skip the restv1 prefix.
+        if pages:
+            return self._filter_pages(self._api.rest_pages(continuation))
+
+        ret = self._api.rest(continuation)
+        return self._records(ret)
+
+    def filter_in(self, field, values, **kwargs):
+        """
+        Return the records where field equals any of the values, like
+        filter(filter=Q(field__in=values), **kwargs), but for any number
+        of values.
+
+        The values are deduplicated and split into chunks that keep the
+        URL short enough. The chunks are fetched concurrently and the
+        results are merged, dropping duplicate records (by key_field).
+
+        With pages set, the chunks are fetched one after another.
+        Options that don't combine with chunking (top, skip, orderby,
+        limits and lazy) raise a ValueError if more than one chunk is
+        needed.
+        """
+        return self._filter_in(self.filter, field, values, kwargs)
+
+    def iterpages(self, **kwargs):
+        """
+        Shortcut for filter(pages=True, ...).
+        """
+        return self.filter(pages=True, **kwargs)
+
+    def iter_batches(self, select=None, **kwargs):
+        """
+        Yield the records one page at a time as columns: a dict of field
+        to (NumPy) array. See exactonline.columns.
+        """
+        return columns.iter_batches(self, select=select, **kwargs)
+
+    def to_columns(self, select=None, **kwargs):
+        """
+        Return all records as columns: a dict of field to (NumPy) array.
+        See exactonline.columns.
+        """
+        return columns.to_columns(self, select=select, **kwargs)
+
+    def parse_result(self, result):
+        """
+        Post-process a list of records. Called for the entire result, or
+        once per page when paginating. Override this in your subclass if
+        you need to touch the records.
+
+        When the api streams results (see ExactRawApi.stream_results),
+        the pages are iterators instead of lists.
+        """
+        return result
 
     # == POST / create ==
 
     def create(self, element_dict):
         ret = self._api.restv1(POST(str(self.resource), element_dict))
+        self._cache_invalidate()
+        if self.mirror is not None:
+            self.mirror.invalidate(self)
+        self._missing.clear()
         return ret
 
     # == DELETE / remove ==
@@ -94,27 +393,358 @@ class Manager(object):
         remote_id = self._remote_guid(remote_guid)
         uri = '%s(%s)' % (self.resource, remote_id)
         ret = self._api.restv1(DELETE(str(uri)))
+        try:
+            self.forget([remote_guid])
+        except Exception:
+            # It is gone remotely; don't report the delete as failed.
+            logger.exception('Forgetting deleted %s failed', remote_guid)
         return ret
 
+    def forget(self, remote_guids):
+        """
+        Drop the records with these GUIDs from the local copies: the
+        cache, the key indexes and the mirror. Called by delete(), and
+        for the deletions reported by sync/Deleted.
+        """
+        remote_guids = set(str(i).lower() for i in remote_guids)
+        self._cache_invalidate()
+        with self._key_lock:
+            for index_key, guids in self._key_guids.items():
+                index = self._key_indexes[index_key]
+                for guid in remote_guids:
+                    key = guids.pop(guid, None)
+                    if key is not None:
+                        index.pop(key, None)
+        if self.mirror is not None:
+            self.mirror.delete(self, remote_guids)
+
     # == PUT / update ==
 
     def update(self, remote_guid, element_dict):
         remote_id = self._remote_guid(remote_guid)
         uri = '%s(%s)' % (self.resource, remote_id)
         ret = self._api.restv1(PUT(str(uri), element_dict))
+        self._cache_invalidate()
+        if self.mirror is not None:
+            self.mirror.invalidate(self)
+        self._missing.clear()  # a changed code may match now
+        return ret
+
+    # == bulk create / update / delete ==
+
+    def bulk_create(self, element_dicts):
+        """
+        Create the elements concurrently. Returns a BulkResult (see
+        api.workers) per element, in order; failures don't stop the
+        others.
+        """
+        return self._bulk(
+            (lambda element_dict: self.create(element_dict)),
+            element_dicts, idempotent=False)
+
+    def bulk_update(self, pairs):
+        """
+        Update the (remote_guid, element_dict) pairs concurrently.
+        Returns a BulkResult per pair, in order.
+        """
+        return self._bulk(
+            (lambda pair: self.update(*pair)), pairs, idempotent=True)
+
+    def bulk_delete(self, remote_guids):
+        """
+        Delete the remote_guids concurrently. Returns a BulkResult per
+        GUID, in order.
+        """
+        return self._bulk(
+            (lambda remote_guid: self.delete(remote_guid)), remote_guids,
+            idempotent=True)
+
+    # == create or update by natural key ==
+
+    def key_index(self, natural_key_field, refresh=False):
+        """
+        Return a dict of natural key (like a relation Code) to GUID, for
+        all records. It is loaded with a single scan of just those two
+        fields and then kept; upsert() and delete() keep it up to date.
+        Pass refresh to reload it.
+        """
+        index_key = (self._api.storage.get_division(), natural_key_field)
+        if refresh or index_key not in self._key_indexes:
+            index, guids = {}, {}
+            select = '%s,%s' % (self.key_field, natural_key_field)
+            for page in self.filter(pages=True, select=select):
+                for record in page:
+                    key = self.natural_key(
+                        natural_key_field, record[natural_key_field])
+                    index[key] = record[self.key_field]
+                    guids[str(index[key]).lower()] = key
+            with self._key_lock:
+                self._key_indexes[index_key] = index
+                self._key_guids[index_key] = guids
+        return self._key_indexes[index_key]
+
+    def natural_key(self, natural_key_field, value):
+        """
+        Return the value as it is used in the key_index(). Override this
+        if the remote values need normalizing.
+        """
+        return value
+
+    def upsert(self, natural_key_field, element_dicts):
+        """
+        Update the elements that exist according to the key_index() and
+        create the others, concurrently. Returns a BulkResult per
+        element, in order; see bulk_create().
+        """
+        index = self.key_index(natural_key_field)
+        index_key = (self._api.storage.get_division(), natural_key_field)
+        element_dicts = list(element_dicts)
+        keys = [
+            self.natural_key(natural_key_field, i[natural_key_field])
+            for i in element_dicts]
+        if len(set(keys)) != len(keys):
+            # We would create them twice.
+            raise ValueError('Duplicate %s values in upsert' % (
+                natural_key_field,))
+
+        def upsert_one(pair):
+            key, element_dict = pair
+            remote_guid = index.get(key)
+            if remote_guid is not None:
+                return self._with_retries(
+                    (lambda data: self.update(remote_guid, data)),
+                    element_dict, idempotent=True)
+            ret = self._with_retries(
+                self.create, element_dict, idempotent=False)
+            with self._key_lock:
+                index[key] = ret[self.key_field]
+                self._key_guids[index_key][str(index[key]).lower()] = key
+            return ret
+
+        ret = run_each(
+            upsert_one, zip(keys, element_dicts),
+            max_workers_for(self._api, self.max_workers))
+        for result in ret:
+            result.item = result.item[1]  # the element_dict, not the pair
         return ret
 
+    def _bulk(self, func, items, idempotent):
+        def call(item):
+            return self._with_retries(func, item, idempotent)
+
+        return run_each(
+            call, items, max_workers_for(self._api, self.max_workers))
+
+    def _with_retries(self, func, item, idempotent):
+        delay = self.retry_delay
+        for attempt in range(self.max_retries):
+            try:
+                return func(item)
+            except HTTPError as e:
+                if e.code not in self.retry_codes or (
+                        e.code != 429 and not idempotent):
+                    raise
+            sleep(delay)
+            delay *= 2
+        return func(item)
+
     # == helpers ==
 
+    def _restv1_cached(self, request):
+        """
+        Return restv1(request), from the cache if possible. Paginated
+        requests, those with limits and those with a decoder other than
+        the manager's own are not cached.
+        """
+        if self.cache is None or request.limits or (
+                request.decoder is not self._get_decoder(None)):
+            return self._api.restv1(request)
+
+        key = self._cache_key(request.resource)
+        ret = self.cache.get(key)
+        if ret is None:
+            ret = self._api.restv1(request)
+            self.cache.set(key, ret, self.cache_ttl)
+        return ret
+
+    def _cache_key(self, resource):
+        return '%s/%s' % (self._api.storage.get_division(), resource)
+
+    def _cache_invalidate(self):
+        if self.cache is not None:
+            for resource in (self.resource, self.bulk_resource):
+                if resource:
+                    self.cache.delete_prefix(self._cache_key(resource))
+
     def _filter_append(self, kwargs, extra_filter):
+        # Both may be a Q or a raw string. Appending and-s keeps the
+        # resulting Q flat.
         if 'filter' in kwargs:
-            kwargs['filter'] = u'(%s) and %s' % (kwargs['filter'],
-                                                 extra_filter)
+            kwargs['filter'] = as_q(kwargs['filter']) & extra_filter
         else:
             kwargs['filter'] = extra_filter
 
+    def _filter_in(self, fetch, field, values, kwargs):
+        # Subclasses pass their super().filter as fetch, so their own
+        # filter() arguments are not processed again for every chunk.
+        chunks = self._filter_in_chunks(field, values, kwargs)
+        if not chunks and kwargs.get('lazy'):
+            chunks = [[]]  # a QuerySet matching nothing
+        if len(chunks) > 1:
+            for key in ('top', 'skip', 'orderby', 'limits', 'lazy'):
+                if kwargs.get(key) is not None:
+                    raise ValueError(
+                        'Cannot split %s__in into %d chunks with %s set' % (
+                            field, len(chunks), key))
+
+        def fetch_chunk(chunk):
+            chunk_kwargs = dict(kwargs)
+            self._filter_append(chunk_kwargs, Q(**{field + '__in': chunk}))
+            return fetch(**chunk_kwargs)
+
+        if kwargs.get('pages'):
+            return (page for chunk in chunks for page in fetch_chunk(chunk))
+
+        results = run_concurrently(
+            fetch_chunk, chunks, max_workers_for(self._api, self.max_workers))
+        if kwargs.get('count'):
+            # The chunks match distinct values, so they don't overlap.
+            return sum(results)
+        if len(results) == 1:
+            return results[0]
+        return self._merge_results(results)
+
+    def _filter_in_chunks(self, field, values, kwargs):
+        """
+        Split the unique values into chunks whose "field eq value or
+        ..." expression fits in max_url_length, together with the rest
+        of the URL for the filter() kwargs.
+        """
+        budget = self.max_url_length - self._url_length(kwargs)
+
+        chunks, chunk, length = [], [], 0
+        or_length = len('%20or%20')
+        for value in _unique(values):
+            value_length = len(Q(**{field: value}).encode()) + or_length
+            if chunk and length + value_length > budget:
+                chunks.append(chunk)
+                chunk, length = [], 0
+            chunk.append(value)
+            length += value_length
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    def _url_length(self, kwargs):
+        """
+        Return the length of the resource and query string for the
+        filter() kwargs, before an __in is added to the $filter.
+        """
+        query = dict(
+            (key, value) for key, value in kwargs.items()
+            if key not in ('count', 'decoder', 'filter', 'lazy', 'limits',
+                           'pages'))
+        if 'select' not in query and self.default_select:
+            query['select'] = self.default_select
+        length = (
+            max(len(self.resource), len(self.bulk_resource or '')) +
+            len(self._query_args(query)) + len('&$filter='))
+        if kwargs.get('filter'):
+            length += (
+                len(as_q(kwargs['filter']).encode()) + len('%20and%20()'))
+        return length
+
+    def _merge_results(self, results):
+        seen = set()
+        ret = []
+        for records in results:
+            for record in records:
+                key = record.get(self.key_field)
+                if key is not None:
+                    if key in seen:
+                        continue
+                    seen.add(key)
+                ret.append(record)
+        return ret
+
+    def _get_key_lookup(self, kwargs):
+        """
+        Return the GUID if kwargs only filter on key_field, or None.
+        """
+        if not self.supports_key_lookup or not kwargs.get('filter') or any(
+                key not in ('filter', 'select') for key in kwargs):
+            return None
+        match = _KEY_LOOKUP.match(str(as_q(kwargs['filter'])))
+        if match and match.group(1) == self.key_field:
+            return match.group(2)
+        return None
+
+    def _negative_cache_key(self, kwargs):
+        return (self._api.storage.get_division(), tuple(sorted(
+            (key, str(value)) for key, value in kwargs.items())))
+
+    def _negative_cache_prune(self):
+        if len(self._missing) >= 1000:
+            now = time()
+            for key, expiry in list(self._missing.items()):
+                if expiry <= now:
+                    self._missing.pop(key, None)
+
+    def _get_decoder(self, decoder):
+        decoder = decoder or self.decoder
+        if decoder is None and self.parse_decimals and self.decimal_fields:
+            if self._decimal_decoder is None:
+                self._decimal_decoder = Decoder(
+                    decimal_fields=self.decimal_fields)
+            decoder = self._decimal_decoder
+        return decoder
+
+    def _records(self, result):
+        result = self.parse_result(result)
+        date_fields = (self.date_fields if self.parse_dates else ())
+        if self.compact_records:
+            # Dates are decoded when they are read.
+            result = to_records(
+                result, tuple((i, decode_date) for i in date_fields))
+        elif date_fields:
+            result = decode_dates(result, date_fields)
+        if self.select_advisor is not None:
+            result = self.select_advisor.track(self, result)
+        return result
+
+    def _filter_pages(self, pages):
+        for page in pages:
+            yield self._records(page)
+
+    def _resource_for(self, kwargs):
+        """
+        Return the bulk_resource if the query can be answered by it, or
+        the regular resource otherwise.
+
+        The bulk endpoints require an explicit $select (no navigation
+        properties) and only know about $select and $filter. Anything
+        else ($top, $skip, $orderby, $expand, ...) needs the regular
+        endpoint.
+        """
+        if not self.bulk_resource:
+            return self.resource
+        select = kwargs.get('select')
+        if not select or select == '*' or '/' in select:
+            return self.resource
+        if any(key not in ('filter', 'select') for key in kwargs):
+            return self.resource
+        return self.bulk_resource
+
     def _remote_datetime(self, remote_datetime):
         return remote_datetime.strftime("datetime'%Y-%m-%d'")
 
     def _remote_guid(self, remote_guid):
         return "guid'%s'" % (remote_guid.replace("'", "''"),)
+
+
+def _unique(values):
+    seen = set()
+    for value in values:
+        if value not in seen:
+            seen.add(value)
+            yield value
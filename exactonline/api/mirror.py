@@ -0,0 +1,315 @@
+# vim: set ts=8 sw=4 sts=4 et ai tw=79:
+"""
+Local SQLite copy of the records of some managers, for fast lookups.
+
+Codes of relations, ledger accounts, VAT codes and items are looked up
+all the time. A Mirror keeps a few fields of those records in an SQLite
+database, per division, and answers the simple lookups locally:
+
+    from exactonline.api.mirror import Mirror
+
+    mirror = Mirror('/var/cache/exact-mirror.sqlite')
+    mirror.add(api.relations, 'ID,Code,Name', source=api.syncaccounts)
+    mirror.add(api.ledgeraccounts, 'ID,Code', source=api.syncglaccounts)
+    mirror.add(api.items, 'ID,Code,CostPriceStandard,Description',
+               source=api.syncitems)
+    mirror.add(api.vatcodes, 'ID,Code,Percentage')
+    mirror.sync()  # call this every now and then
+
+    api.relations.get(relation_code='123')  # no API call
+
+Managers with a source (a SyncManager, see api.sync) are kept current
+incrementally: sync() only fetches the records that changed since the
+last sync. The others are reloaded completely by every sync(), so use
+that for small tables only.
+
+A filter() or get() is answered locally if:
+
+  - the filter is made of Q lookups (see api.query) that are equality
+    (or __in) lookups on indexed fields, combined with and;
+  - all fields in the $select are mirrored;
+  - there are no other parameters than $filter, $select and $top, and
+    no pages, limits or count;
+  - the mirror of the division has been synced, and there have been no
+    create() or update() calls on the manager since. (A delete() is
+    applied to the mirror too.)
+  - the mirror has at least one matching record. A lookup that finds
+    nothing locally goes to the API, because the record may have been
+    created after the last sync.
+
+Everything else goes to the API, as usual. The indexed fields (by
+default the key_field and Code) are compared case insensitively, like
+Exact does.
+
+Records deleted in Exact stay in the mirror until the deletion is
+applied from the sync/Deleted resource:
+
+    api.syncdeleted.apply_tombstones([api.relations, api.items])
+
+This file is part of the Exact Online REST API Library in Python
+(EORALP), licensed under the LGPLv3+.
+Copyright (C) 2021 Walter Doekes, OSSO B.V.
+"""
+import pickle
+import sqlite3
+
+from collections import namedtuple
+from contextlib import contextmanager
+from threading import Lock
+
+from .query import AND, Q, _Lookup, as_q
+
+_Entry = namedtuple('_Entry', 'manager fields index source')
+
+
+class Mirror(object):
+    """
+    Mirrors the records of managers into an SQLite database. See the
+    module docs.
+    """
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS mirror (
+            name TEXT PRIMARY KEY,
+            fields TEXT NOT NULL,
+            timestamp INTEGER NOT NULL,
+            ready INTEGER NOT NULL)'''
+
+    def __init__(self, filename):
+        self._conn = sqlite3.connect(
+            filename, timeout=30, check_same_thread=False,
+            isolation_level=None)  # autocommit, unless we BEGIN
+        self._conn.execute(self.SCHEMA)
+        self._lock = Lock()
+        self._entries = {}  # manager => _Entry
+
+    def add(self, manager, fields, index=('Code',), source=None):
+        """
+        Mirror the fields (a $select) of the records of manager, and
+        answer lookups on the index fields locally. The key_field of the
+        manager is always mirrored and indexed. Changes are fetched from
+        the source SyncManager; without one, the records are reloaded
+        completely on every sync().
+        """
+        fields = fields.split(',')
+        if manager.key_field not in fields:
+            fields.insert(0, manager.key_field)
+        index = [manager.key_field] + [
+            i for i in index if i != manager.key_field]
+        missing = [i for i in index if i not in fields]
+        if missing:
+            raise ValueError('Index fields %r are not mirrored' % (missing,))
+
+        self._entries[manager] = _Entry(
+            manager, tuple(fields), tuple(index), source)
+        manager.mirror = self
+
+    def sync(self):
+        """
+        Bring the mirrors up to date, for the current division of their
+        api. Returns the number of records fetched.
+        """
+        return sum(self._sync(i) for i in list(self._entries.values()))
+
+    def lookup(self, manager, kwargs):
+        """
+        Return the records for the filter() kwargs, or None if the
+        lookup cannot be answered locally (or finds nothing). Called by
+        the manager.
+        """
+        entry = self._entries.get(manager)
+        if entry is None or any(
+                i not in ('filter', 'select', 'top') for i in kwargs):
+            return None
+
+        select = (kwargs.get('select') or '*').split(',')
+        if any(i not in entry.fields for i in select):
+            return None  # includes '*'
+        conditions = _conditions(as_q(kwargs.get('filter', '')))
+        if not conditions or any(i not in entry.index for i in conditions):
+            return None
+
+        where = ' AND '.join(
+            '"%s" IN (%s)' % (field, ','.join('?' * len(values)))
+            for field, values in conditions.items())
+        params = [
+            _column_value(value) for values in conditions.values()
+            for value in values]
+        name = self._name(entry)
+        with self._lock:
+            if not self._is_ready(name, entry):
+                return None
+            rows = self._conn.execute(
+                'SELECT data FROM "%s" WHERE %s LIMIT ?' % (name, where),
+                params + [kwargs.get('top', -1)]).fetchall()
+
+        if not rows:
+            # Maybe created after the last sync(): ask the API.
+            return None
+        records = [pickle.loads(i[0]) for i in rows]
+        return [dict((i, record[i]) for i in select) for record in records]
+
+    def delete(self, manager, keys):
+        """
+        Drop the records with these keys (key_field values) from the
+        mirror of manager, in the current division.
+        """
+        entry = self._entries.get(manager)
+        if entry is None:
+            return
+        name = self._name(entry)
+        with self._transaction():
+            self._prepare(name, entry)
+            self._conn.executemany(
+                'DELETE FROM "%s" WHERE "%s" = ?' % (name, manager.key_field),
+                [(_column_value(i),) for i in keys])
+
+    def invalidate(self, manager):
+        """
+        Stop answering lookups for manager locally, until the next
+        sync(). Called when records are created or updated.
+        """
+        if manager in self._entries:
+            with self._lock:
+                self._set_ready(
+                    self._name(self._entries[manager]), ready=False)
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield
+            except BaseException:
+                self._conn.execute('ROLLBACK')
+                raise
+            self._conn.execute('COMMIT')
+
+    def _name(self, entry):
+        storage = entry.manager._api.storage
+        return '%s/%s' % (storage.get_division(), entry.manager.resource)
+
+    def _is_ready(self, name, entry):
+        row = self._conn.execute(
+            'SELECT fields, ready FROM mirror WHERE name = ?',
+            (name,)).fetchone()
+        return row == (','.join(entry.fields), 1)
+
+    def _prepare(self, name, entry):
+        """
+        Create the table if needed, and return the timestamp it has been
+        synced to.
+        """
+        fields = ','.join(entry.fields)
+        row = self._conn.execute(
+            'SELECT fields, timestamp FROM mirror WHERE name = ?',
+            (name,)).fetchone()
+        if row and row[0] == fields:
+            return row[1]
+
+        # New, or the fields were changed: start over.
+        self._conn.execute('DROP TABLE IF EXISTS "%s"' % (name,))
+        self._conn.execute(
+            'CREATE TABLE "%s" (%s PRIMARY KEY, %s data BLOB NOT NULL)' % (
+                name, '"%s" COLLATE NOCASE' % (entry.index[0],), ''.join(
+                    '"%s" COLLATE NOCASE, ' % (i,) for i in entry.index[1:])))
+        for field in entry.index[1:]:
+            self._conn.execute('CREATE INDEX "%s/%s" ON "%s" ("%s")' % (
+                name, field, name, field))
+        self._conn.execute(
+            'INSERT OR REPLACE INTO mirror VALUES (?, ?, 1, 0)',
+            (name, fields))
+        return 1
+
+    def _sync(self, entry):
+        name = self._name(entry)
+        with self._transaction():
+            timestamp = self._prepare(name, entry)
+
+        if entry.source is None:
+            # Reload everything. Fetch first, so lookups are answered
+            # while we wait for the API.
+            records = []
+            for page in entry.manager.filter(
+                    pages=True, select=','.join(entry.fields)):
+                records.extend(page)
+            with self._transaction():
+                self._conn.execute('DELETE FROM "%s"' % (name,))
+                self._store(name, entry, records, timestamp)
+                self._set_ready(name)
+            return len(records)
+
+        count = 0
+        for page in entry.source.iter_changes(
+                timestamp, select=','.join(entry.fields)):
+            # The records and the new timestamp are committed together.
+            timestamp = max(i['Timestamp'] for i in page)
+            with self._transaction():
+                self._store(name, entry, page, timestamp)
+            count += len(page)
+        with self._lock:
+            self._set_ready(name)
+        return count
+
+    def _set_ready(self, name, ready=True):
+        self._conn.execute(
+            'UPDATE mirror SET ready = ? WHERE name = ?', (int(ready), name))
+
+    def _store(self, name, entry, records, timestamp):
+        self._conn.executemany(
+            'INSERT OR REPLACE INTO "%s" VALUES (%s)' % (
+                name, ','.join('?' * (len(entry.index) + 1))),
+            [[_column_value(record.get(i)) for i in entry.index] + [
+                sqlite3.Binary(pickle.dumps(
+                    dict((i, record.get(i)) for i in entry.fields),
+                    pickle.HIGHEST_PROTOCOL))]
+             for record in records])
+        self._conn.execute(
+            'UPDATE mirror SET timestamp = ? WHERE name = ?',
+            (timestamp, name))
+
+
+def _column_value(value):
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    return str(value)
+
+
+def _conditions(q):
+    """
+    Return a dict of field to values for a Q made of equality lookups
+    and-ed together (or-ed together on the same field, like __in), or
+    None if it is anything else.
+    """
+    if isinstance(q, _Lookup):
+        if q.operator == 'eq' and isinstance(q.value, (str, int)):
+            return {q.field: [q.value]}
+        return None
+    if type(q) is not Q or q.negated or not q.children:
+        return None  # raw expressions, or not()
+
+    parts = [_conditions(i) for i in q.children]
+    if None in parts:
+        return None
+    if len(parts) == 1:
+        return parts[0]
+    if q.connector == AND:
+        return _and_conditions(parts)
+    return _or_conditions(parts)
+
+
+def _and_conditions(parts):
+    ret = {}
+    for part in parts:
+        for field, values in part.items():
+            if field in ret:
+                return None
+            ret[field] = values
+    return ret
+
+
+def _or_conditions(parts):
+    fields = set(field for part in parts for field in part)
+    if len(fields) != 1 or any(len(part) != 1 for part in parts):
+        return None
+    field = fields.pop()
+    return {field: [value for part in parts for value in part[field]]}
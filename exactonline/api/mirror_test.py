@@ -0,0 +1,157 @@
+# vim: set ts=8 sw=4 sts=4 et ai tw=79:
+"""
+Mirror tests.
+
+This file is part of the Exact Online REST API Library in Python
+(EORALP), licensed under the LGPLv3+.
+Copyright (C) 2021 Walter Doekes, OSSO B.V.
+"""
+from unittest import TestCase
+try:
+    from urllib.parse import unquote
+except ImportError:  # python2
+    from urllib import unquote
+
+from .. import api_test
+from ..api_test import RecordingApi, WritableApi
+from ..exceptions import ObjectDoesNotExist
+from .ledgeraccounts import LedgerAccounts
+from .mirror import Mirror
+from .query import Guid, Q
+from .relations import Relations
+from .syncaccounts import SyncAccounts
+from .syncdeleted import SyncDeleted
+from .vatcodes import VatCodes
+
+
+class MirrorTestCase(TestCase):
+    def get_api(self, api_class, *results):
+        api = api_class(*results)
+        api.storage = api_test.ApiTestCase.MemoryStorage(server_port=0)
+        return api
+
+    def test_incremental(self):
+        api = self.get_api(
+            RecordingApi, [],
+            [{'Timestamp': 5, 'ID': 'a', 'Code': '    1', 'Name': 'ACME'},
+             {'Timestamp': 7, 'ID': 'b', 'Code': '    2', 'Name': 'Daffy'}])
+        relations, syncaccounts = Relations(api), SyncAccounts(api)
+        mirror = Mirror(':memory:')
+        mirror.add(relations, 'ID,Code,Name', source=syncaccounts)
+
+        # Not synced yet: remote.
+        self.assertEqual(relations.filter(filter=Q(Code='1')), [])
+        self.assertEqual(mirror.sync(), 2)
+        self.assertIn(
+            'sync/CRM/Accounts?$select=Timestamp,ID,Code,Name',
+            unquote(api.requests[-1].resource))
+        calls = len(api.requests)
+
+        self.assertEqual(
+            relations.filter(filter=Q(Code='    2')),
+            [{'ID': 'b', 'Code': '    2', 'Name': 'Daffy'}])
+        self.assertEqual(
+            relations.filter(
+                filter=Q(Code__in=['    1', '    2']), select='Name'),
+            [{'Name': 'ACME'}, {'Name': 'Daffy'}])
+        relation = relations.get(filter=Q(ID=Guid('B')))
+        self.assertEqual(relation['Code'], '    2')
+        self.assertEqual(len(api.requests), calls)
+
+        # Not in the mirror: created since the sync? Ask remote.
+        api.results = [[{'ID': 'c', 'Code': '    3', 'Name': 'Bugs'}]]
+        self.assertEqual(relations.get(filter=Q(Code='    3'))['ID'], 'c')
+        api.results = [[]]
+        self.assertRaises(
+            ObjectDoesNotExist, relations.get, filter=Q(Code='    4'))
+        self.assertEqual(len(api.requests), calls + 2)
+        calls = len(api.requests)
+
+        # Other lookups go remote.
+        relations.filter(filter=Q(Name='ACME'))
+        relations.filter(filter=Q(Code='    1'), select='ID,City')
+        relations.filter(filter=Q(Code__startswith='1'))
+        self.assertEqual(len(api.requests), calls + 3)
+
+        # Next sync only asks for the changes.
+        api.results = [
+            [{'Timestamp': 9, 'ID': 'b', 'Code': '    2', 'Name': 'Duck'}]]
+        self.assertEqual(mirror.sync(), 1)
+        self.assertIn(
+            'Timestamp gt 7', unquote(api.requests[-1].resource))
+        self.assertEqual(relations.get(filter=Q(ID='b'))['Name'], 'Duck')
+
+    def test_reload_and_writes(self):
+        api = self.get_api(
+            WritableApi,
+            [{'ID': 'a', 'Code': '1', 'Percentage': 0.21}])
+        vatcodes = VatCodes(api)
+        mirror = Mirror(':memory:')
+        mirror.add(vatcodes, 'ID,Code,Percentage')
+        mirror.sync()
+        calls = len(api.requests)
+        self.assertEqual(vatcodes.get_percentage(vat_code='1'), 0.21)
+        self.assertEqual(len(api.requests), calls)
+
+        # After an update, we ask remote until the next sync.
+        vatcodes.update('a', {'Percentage': 0.09})
+        vatcodes.filter(vat_code='1')
+        self.assertEqual(len(api.requests), calls + 2)
+
+        # A delete is applied locally: the lookup no longer finds it
+        # there, and asks remote.
+        api.results = [[{'ID': 'a', 'Code': '1', 'Percentage': 0.09}]]
+        mirror.sync()
+        vatcodes.delete('a')
+        calls = len(api.requests)
+        api.results = [[]]
+        self.assertEqual(vatcodes.filter(vat_code='1'), [])
+        self.assertEqual(len(api.requests), calls + 1)
+
+    def test_tombstones(self):
+        api = self.get_api(
+            RecordingApi,
+            [{'Timestamp': 5, 'ID': 'a', 'Code': '1', 'Name': 'ACME'},
+             {'Timestamp': 7, 'ID': 'b', 'Code': '2', 'Name': 'Daffy'}])
+        relations = Relations(api)
+        mirror = Mirror(':memory:')
+        mirror.add(relations, 'ID,Code,Name', source=SyncAccounts(api))
+        mirror.sync()
+
+        api.results = [
+            [{'Timestamp': 3, 'EntityKey': 'A', 'EntityType': 2},
+             {'Timestamp': 4, 'EntityKey': 'b', 'EntityType': 9}]]
+        self.assertEqual(SyncDeleted(api).apply_tombstones([relations]), 2)
+        self.assertEqual(
+            relations.filter(filter=Q(Code__in=['1', '2']), select='ID'),
+            [{'ID': 'b'}])
+
+    def test_filter_in(self):
+        api = self.get_api(
+            RecordingApi, [{'ID': i, 'Code': str(n)}
+                           for n, i in enumerate('abcde', 1)])
+        ledgeraccounts = LedgerAccounts(api)
+        mirror = Mirror(':memory:')
+        mirror.add(ledgeraccounts, 'ID,Code')
+        mirror.sync()
+        calls = len(api.requests)
+        ledgeraccounts.max_url_length = 30  # many chunks
+        self.assertEqual(
+            sorted(i['ID'] for i in ledgeraccounts.filter(
+                code__in=['1', '2', '3', '4', '5'])),
+            ['a', 'b', 'c', 'd', 'e'])
+        self.assertEqual(len(api.requests), calls)
+
+    def test_changed_fields(self):
+        api = self.get_api(RecordingApi, [{'ID': 'a', 'Code': '1'}])
+        vatcodes = VatCodes(api)
+        mirror = Mirror(':memory:')
+        mirror.add(vatcodes, 'ID,Code')
+        mirror.sync()
+        self.assertEqual(len(vatcodes.filter(vat_code='1', select='ID')), 1)
+
+        # Other fields: start over.
+        mirror.add(vatcodes, 'ID,Code,Percentage')
+        self.assertEqual(vatcodes.filter(vat_code='1', select='ID'), [])
+        self.assertRaises(
+            ValueError, mirror.add, vatcodes, 'ID,Code', index=('Name',))
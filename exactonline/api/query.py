@@ -0,0 +1,295 @@
+# vim: set ts=8 sw=4 sts=4 et ai tw=79:
+"""
+Composable $filter expressions, Django style.
+
+    Q(Code='123')                       Code eq '123'
+    Q(Modified__gt=date(2021, 1, 1))    Modified gt datetime'2021-01-01'
+    Q(ID__in=[Guid(a), Guid(b)])        ID eq guid'a' or ID eq guid'b'
+    Q(Amount__range=(1, 10))            Amount ge 1 and Amount le 10
+    Q(Name__startswith='AC')            startswith(Name,'AC') eq true
+
+Combine them with & and |, negate them with ~. Plain strings are
+taken as raw filter expressions:
+
+    Q("Status eq 'C'") & Q(Code='123') | ~Q(Blocked=True)
+
+Nested and-s (and or-s) are flattened and parentheses are only added
+where they are needed, so appending filters over and over does not
+yield ((a) and b) and c.
+
+An empty __in matches nothing. The managers don't send a query for a
+filter that can't match anything, see matches_nothing().
+
+The compiled expression is kept as a template (the static parts) and
+the literals. The URL encoding of the template is cached, so repeated
+queries only need to encode their literals.
+
+This file is part of the Exact Online REST API Library in Python
+(EORALP), licensed under the LGPLv3+.
+Copyright (C) 2021 Walter Doekes, OSSO B.V.
+"""
+from datetime import date, datetime
+from decimal import Decimal
+from uuid import UUID
+
+from ..http import binquote
+
+try:
+    from functools import lru_cache
+except ImportError:  # python2
+    def lru_cache(maxsize):
+        return (lambda func: func)
+
+AND = 'and'
+OR = 'or'
+
+OPERATORS = ('eq', 'ne', 'gt', 'ge', 'lt', 'le')
+FUNCTIONS = {
+    'contains': u'substringof(%(value)s,%(field)s) eq true',
+    'endswith': u'endswith(%(field)s,%(value)s) eq true',
+    'startswith': u'startswith(%(field)s,%(value)s) eq true',
+}
+
+
+class Guid(str):
+    """
+    A string holding a GUID; it is rendered as guid'...'.
+    """
+    pass
+
+
+def literal(value):
+    """
+    Render a Python value as OData literal.
+    """
+    if value is None:
+        return u'null'
+    if value is True or value is False:
+        return (u'false', u'true')[value]
+    if isinstance(value, (Guid, UUID)):
+        return u"guid'%s'" % (value,)
+    if isinstance(value, datetime):
+        return value.strftime(u"datetime'%Y-%m-%dT%H:%M:%S'")
+    if isinstance(value, date):
+        return value.strftime(u"datetime'%Y-%m-%d'")
+    if isinstance(value, (int, float, Decimal)):
+        return _number(value)
+    if isinstance(value, str):
+        return u"'%s'" % (value.replace(u"'", u"''"),)
+    raise TypeError('Cannot render %r as OData literal' % (value,))
+
+
+def _number(value):
+    if isinstance(value, int):
+        return str(value)
+    if isinstance(value, float):
+        value = Decimal(repr(value))
+    # OData wants no exponent: 1e-05 must be 0.00001.
+    return format(value, 'f')
+
+
+@lru_cache(maxsize=512)
+def cached_binquote(value):
+    """
+    binquote() for values that are used over and over, like the
+    template parts and the $select lists.
+    """
+    return binquote(value)
+
+
+class _Template(object):
+    def __init__(self):
+        self.parts = [u'']
+        self.literals = []
+
+    def text(self, value):
+        self.parts[-1] += value
+
+    def literal(self, value):
+        self.literals.append(literal(value))
+        self.parts.append(u'')
+
+
+class Q(object):
+    """
+    A $filter expression. See the module docs.
+    """
+    def __init__(self, *args, **lookups):
+        self.connector = AND
+        self.negated = False
+        self.children = [as_q(i) for i in args]
+        for key, value in lookups.items():
+            self.children.append(_lookup(key, value))
+
+    def __repr__(self):
+        return '<Q: %s>' % (self,)
+
+    def __str__(self):
+        parts, literals = self.compile()
+        ret = [parts[0]]
+        for literal_, part in zip(literals, parts[1:]):
+            ret.extend([literal_, part])
+        return u''.join(ret)
+
+    def __bool__(self):
+        return bool(self.children)
+    __nonzero__ = __bool__  # python2
+
+    def __and__(self, other):
+        return self._combine(other, AND)
+
+    def __or__(self, other):
+        return self._combine(other, OR)
+
+    def __invert__(self):
+        ret = self._clone(self.connector, self.children)
+        ret.negated = not self.negated
+        return ret
+
+    def matches_nothing(self):
+        """
+        Return whether the expression is known not to match anything,
+        like an empty __in (and-ed to something else).
+        """
+        if self.negated or not self.children:
+            return False
+        if self.connector == AND:
+            return any(i.matches_nothing() for i in self.children)
+        return all(i.matches_nothing() for i in self.children)
+
+    def compile(self):
+        """
+        Return the static template parts and the rendered literals; the
+        literals go between the parts.
+        """
+        template = _Template()
+        self._render(template, None)
+        return tuple(template.parts), tuple(template.literals)
+
+    def encode(self):
+        """
+        Return the URL-encoded expression.
+        """
+        parts, literals = self.compile()
+        ret = [cached_binquote(parts[0])]
+        for literal_, part in zip(literals, parts[1:]):
+            ret.extend([binquote(literal_), cached_binquote(part)])
+        return ''.join(ret)
+
+    def _clone(self, connector, children):
+        ret = Q()
+        ret.connector = connector
+        ret.children = list(children)
+        return ret
+
+    def _combine(self, other, connector):
+        children = []
+        for node in (self, as_q(other)):
+            if not node:
+                continue
+            if (node.connector == connector or len(node.children) == 1) \
+                    and not node.negated:
+                children.extend(node.children)  # flatten (Raw holds self)
+            else:
+                children.append(node)
+        return self._clone(connector, children)
+
+    def _render(self, template, parent_connector):
+        if len(self.children) == 1 and not self.negated:
+            self.children[0]._render(template, parent_connector)
+            return
+
+        if self.negated:
+            template.text(u'not (')
+        elif parent_connector == AND and self.connector == OR:
+            template.text(u'(')
+
+        connector = (self.connector, None)[len(self.children) == 1]
+        for idx, child in enumerate(self.children):
+            if idx:
+                template.text(u' %s ' % (self.connector,))
+            child._render(template, connector)
+
+        if self.negated or (parent_connector == AND and self.connector == OR):
+            template.text(u')')
+
+
+class Raw(Q):
+    """
+    A raw filter expression. It gets parentheses when it is combined
+    with others, because we don't know what is inside.
+    """
+    def __init__(self, expression, safe=False):
+        super(Raw, self).__init__()
+        self.expression = expression
+        self.safe = safe
+        self.children = [self]  # non-empty; flattening yields self
+
+    def matches_nothing(self):
+        return False
+
+    def _render(self, template, parent_connector):
+        if parent_connector and not self.safe:
+            template.text(u'(%s)' % (self.expression,))
+        else:
+            template.text(self.expression)
+
+
+class _Nothing(Raw):
+    """
+    The expression for an empty __in.
+    """
+    def __init__(self):
+        super(_Nothing, self).__init__(u'false', safe=True)
+
+    def matches_nothing(self):
+        return not self.negated
+
+
+class _Lookup(Raw):
+    def __init__(self, field, operator, value):
+        super(_Lookup, self).__init__(None, safe=True)
+        self.field = field
+        self.operator = operator
+        self.value = value
+
+    def _render(self, template, parent_connector):
+        if self.operator in FUNCTIONS:
+            before, after = FUNCTIONS[self.operator].split(u'%(value)s')
+            template.text(before % {'field': self.field})
+            template.literal(self.value)
+            template.text(after % {'field': self.field})
+        else:
+            template.text(u'%s %s ' % (self.field, self.operator))
+            template.literal(self.value)
+
+
+def as_q(value):
+    """
+    Return value as Q; strings are taken as raw expressions.
+    """
+    if isinstance(value, Q):
+        return value
+    return Raw(value)
+
+
+def _lookup(key, value):
+    field, _, operator = key.partition('__')
+    operator = operator or 'eq'
+
+    if operator == 'in':
+        values = list(value)
+        if not values:
+            return _Nothing()
+        ret = Q()
+        ret.connector = OR
+        ret.children = [_Lookup(field, 'eq', value) for value in values]
+        return ret
+
+    if operator == 'range':
+        low, high = value
+        return _Lookup(field, 'ge', low) & _Lookup(field, 'le', high)
+
+    if operator not in OPERATORS and operator not in FUNCTIONS:
+        raise ValueError('Unknown lookup %r in %r' % (operator, key))
+    return _Lookup(field, operator, value)
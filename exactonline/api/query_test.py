@@ -0,0 +1,68 @@
+# vim: set ts=8 sw=4 sts=4 et ai tw=79:
+"""
+Query builder tests.
+
+This file is part of the Exact Online REST API Library in Python
+(EORALP), licensed under the LGPLv3+.
+Copyright (C) 2021 Walter Doekes, OSSO B.V.
+"""
+from datetime import date, datetime
+from decimal import Decimal
+from unittest import TestCase
+
+from .query import Guid, Q
+
+
+class QTestCase(TestCase):
+    def test_literals(self):
+        self.assertEqual(
+            str(Q(Code="O'Neil", Blocked=False, Parent=None, Amount=1.5)),
+            "Code eq 'O''Neil' and Blocked eq false and Parent eq null "
+            "and Amount eq 1.5")
+        # No exponents.
+        self.assertEqual(
+            str(Q(Amount=1e-05, Price=Decimal('1E+2'), Qty=1e16)),
+            'Amount eq 0.00001 and Price eq 100 and Qty eq 10000000000000000')
+        self.assertEqual(
+            str(Q(ID=Guid('1234'), Created__lt=date(2021, 2, 3),
+                  Modified__ge=datetime(2021, 2, 3, 4, 5, 6))),
+            "ID eq guid'1234' and Created lt datetime'2021-02-03' "
+            "and Modified ge datetime'2021-02-03T04:05:06'")
+
+    def test_lookups(self):
+        self.assertEqual(
+            str(Q(Code__in=['1', '2'])), "Code eq '1' or Code eq '2'")
+        self.assertEqual(str(Q(Code__in=[])), 'false')
+        self.assertEqual(
+            str(Q(Code__in=['1', '2']) & Q(Name='x')),
+            "(Code eq '1' or Code eq '2') and Name eq 'x'")
+        self.assertEqual(str(Q(Code__in=['1'])), "Code eq '1'")
+        self.assertTrue(Q(Code__in=[]).matches_nothing())
+        self.assertTrue((Q(Code__in=[]) & Q(Name='x')).matches_nothing())
+        self.assertFalse((Q(Code__in=[]) | Q(Name='x')).matches_nothing())
+        self.assertFalse((~Q(Code__in=[])).matches_nothing())
+        self.assertFalse(Q('false').matches_nothing())
+        self.assertEqual(
+            str(Q(Amount__range=(1, 10))), 'Amount ge 1 and Amount le 10')
+        self.assertEqual(
+            str(Q(Name__startswith='AC')), "startswith(Name,'AC') eq true")
+        self.assertRaises(ValueError, Q, Code__like='x')
+
+    def test_flat_and_minimal(self):
+        q = Q(u"Currency eq 'EUR'")
+        for i in range(3):
+            q = q & Q(Amount__gt=i)
+        self.assertEqual(
+            str(q), "(Currency eq 'EUR') and Amount gt 0 and Amount gt 1 "
+            "and Amount gt 2")
+        self.assertEqual(
+            str(Q(Code__in=['1', '2']) & Q(Blocked=False)),
+            "(Code eq '1' or Code eq '2') and Blocked eq false")
+        self.assertEqual(
+            str(Q(A=1) & Q(B=2) | ~Q(C=3, D=4)),
+            'A eq 1 and B eq 2 or not (C eq 3 and D eq 4)')
+
+    def test_encode(self):
+        q = Q(Code=u'€ 1')
+        self.assertEqual(q.compile(), (('Code eq ', ''), (u"'€ 1'",)))
+        self.assertEqual(q.encode(), 'Code%20eq%20%27%E2%82%AC%201%27')
@@ -0,0 +1,157 @@
+# vim: set ts=8 sw=4 sts=4 et ai tw=79:
+"""
+Lazy results for Manager.filter(lazy=True).
+
+A QuerySet holds the filter() arguments and only queries the API when
+it is evaluated. Slicing translates to $top and $skip, so this fetches
+two relations, not all of them:
+
+    api.relations.all(lazy=True)[0:2]
+
+Chaining and-s the filters:
+
+    invoices = api.invoices.filter(lazy=True, reporting_period=period)
+    unpaid = invoices.filter(Q(Status=20))
+
+Iterating streams the results page by page; every iteration queries
+the API again. There is no len(), because list() would use it and fetch
+everything twice: use count() for a server-side count. bool() is the
+same as exists().
+
+This file is part of the Exact Online REST API Library in Python
+(EORALP), licensed under the LGPLv3+.
+Copyright (C) 2021 Walter Doekes, OSSO B.V.
+"""
+from .query import Q, as_q
+
+
+class QuerySet(object):
+    """
+    A filter() on a manager that is yet to be run. See the module docs.
+    """
+    def __init__(self, manager, params):
+        self._manager = manager
+        self._params = params  # the (translated) manager.filter() kwargs
+        self._result = None  # only set when we know it's empty
+        filter_ = params.get('filter')
+        if isinstance(filter_, Q) and filter_.matches_nothing():
+            self._result = []
+
+    def __repr__(self):
+        return '<QuerySet: %s %r>' % (
+            self._manager.__class__.__name__, self._params)
+
+    def __iter__(self):
+        if self._result is not None:
+            return iter(self._result)
+        return (record for page in self.iterpages() for record in page)
+
+    def __bool__(self):
+        return self.exists()
+    __nonzero__ = __bool__  # python2
+
+    def __getitem__(self, key):
+        if self._result is not None:
+            return self._result[key]
+
+        if isinstance(key, slice):
+            if (key.step not in (None, 1) or (key.start or 0) < 0 or
+                    (key.stop is not None and key.stop < 0)):
+                raise ValueError('Only non-negative slices without step')
+            return self._slice(key.start or 0, key.stop)
+
+        if key < 0:
+            raise ValueError('Negative indexing is not supported')
+        ret = list(self._slice(key, key + 1))
+        if not ret:
+            raise IndexError(key)
+        return ret[0]
+
+    def all(self):
+        return self._clone(dict(self._params))
+
+    def filter(self, *args, **kwargs):
+        """
+        Return a new QuerySet with the Q objects in args and the filter()
+        kwargs of the manager and-ed to this one. Other arguments (like
+        select or orderby) replace the ones we have.
+        """
+        params = dict(self._params)
+        filter_ = params.pop('filter', None)
+        if kwargs:
+            # Let the manager translate its own arguments.
+            params.update(kwargs)
+            params = self._manager.filter(lazy=True, **params)._params
+
+        filters = [filter_, params.pop('filter', None)] + list(args)
+        combined = Q()
+        for value in filters:
+            if value:
+                combined &= as_q(value)
+        if combined:
+            params['filter'] = combined
+        return self._clone(params)
+
+    def count(self):
+        """
+        Return the number of records, using resource/$count.
+        """
+        if self._result is not None:
+            return len(self._result)
+
+        params = dict(self._params)
+        skip = int(params.pop('skip', 0))
+        top = params.pop('top', None)
+        for key in ('decoder', 'limits', 'orderby'):
+            params.pop(key, None)
+
+        count = max(self._manager._filter(count=True, **params) - skip, 0)
+        if top is not None:
+            count = min(count, int(top))
+        return count
+
+    def exists(self):
+        """
+        Return whether there are any records, fetching at most the
+        key_field of one.
+        """
+        if self._result is not None:
+            return bool(self._result)
+
+        first = self[0:1]
+        if first._result is not None:
+            return False
+        params = dict(first._params, select=self._manager.key_field)
+        return bool(self._manager._filter(**params))
+
+    def iterpages(self):
+        """
+        Yield the records one page at a time.
+        """
+        if self._result is not None:
+            return iter([self._result])
+        return self._manager._filter(pages=True, **self._params)
+
+    def _clone(self, params):
+        return self.__class__(self._manager, params)
+
+    def _slice(self, start, stop):
+        params = dict(self._params)
+        skip = int(params.pop('skip', 0)) + start
+        top = params.pop('top', None)
+
+        if top is not None:
+            top = max(int(top) - start, 0)
+        if stop is not None:
+            length = max(stop - start, 0)
+            top = length if top is None else min(top, length)
+
+        if skip:
+            params['skip'] = skip
+        if top is not None:
+            params['top'] = top
+
+        ret = self._clone(params)
+        if top == 0:
+            ret._result = []  # $top=0 is not something to ask for
+        return ret
@@ -4,9 +4,8 @@ Helpers to work with Quotations in exact online.
 
 Written by Ties Verschuren
 """
-import datetime
-
 from .manager import Manager
+from ..dates import parse_json_date
 from ..resource import GET
 
 
@@ -42,6 +41,16 @@ class QuotationAcceptAction:
 
 class Quotations(Manager):
     resource = 'crm/Quotations'
+    date_fields = ('CloseDate',
+                   'ClosingDate',
+                   'Created',
+                   'DueDate',
+                   'Modified',
+                   'QuotationDate')
+    # Also in the QuotationLines, which get() decodes the same way.
+    decimal_fields = ('AmountDC', 'AmountFC', 'VATAmountFC')
+    # Quotations have always had their dates parsed.
+    parse_dates = True
 
     def get(self, **kwargs):
         quotations_dict = super(Quotations, self).get(**kwargs)
@@ -51,36 +60,11 @@ class Quotations(Manager):
             # Perhaps there is a 'select' filter.
             pass
         else:
-            quotation_lines_dict = self._api.restv1(GET(str(uri)))
+            quotation_lines_dict = self._api.restv1(
+                GET(str(uri), decoder=self._get_decoder(None)))
             quotations_dict[u'QuotationLines'] = quotation_lines_dict
 
-        return self.parse_result(quotations_dict)
-
-    def filter(self, **kwargs):
-        return self.parse_result(super(Quotations, self).filter(**kwargs))
-
-    def parse_result(self, result):
-        """
-        Pares the response from the api
-        by making datetime objects of the json date strings
-
-        :param result: The response to parse
-        :return: Parsed response
-        """
-        # Converts dates
-        date_fields = ('CloseDate',
-                       'ClosingDate',
-                       'Created',
-                       'DueDate',
-                       'Modified',
-                       'QuotationDate')
-        for quotation in result:
-            for date_field in date_fields:
-                if date_field in quotation:
-                    quotation[date_field] = self.json_date_to_datetime(
-                        quotation[date_field])
-
-        return result
+        return quotations_dict
 
     def json_date_to_datetime(self, json):
         """
@@ -89,17 +73,4 @@ class Quotations(Manager):
         :param json: A .NET json date like /Date(1516741035800)/
         :return: datetime The date as an datetime object
         """
-        # sign in case a timezone is also in the date
-        sign = json[-7]
-        if sign not in '-+' or len(json) == 13:
-            milliseconds = int(json[6:-2])
-        else:
-            milliseconds = int(json[6:-7])
-            hh = int(json[-7:-4])
-            mm = int(json[-4:-2])
-            if sign == '-':
-                mm = -mm
-            milliseconds += (hh * 60 + mm) * 60000
-
-        return datetime.datetime(1970, 1, 1) + datetime.timedelta(
-            milliseconds=milliseconds)
+        return parse_json_date(json)
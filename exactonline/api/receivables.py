@@ -7,6 +7,7 @@ This file is part of the Exact Online REST API Library in Python
 Copyright (C) 2015 Walter Doekes, OSSO B.V.
 """
 from .manager import Manager
+from .query import Guid, Q
 
 
 class Receivables(Manager):
@@ -15,6 +16,10 @@ class Receivables(Manager):
     Receivables, you call this.
     """
     resource = 'read/financial/ReceivablesList'
+    # No read/...(guid'...') addressing.
+    supports_key_lookup = False
+    date_fields = ('DueDate', 'InvoiceDate')
+    decimal_fields = ('Amount', 'AmountInTransit')
 
     def filter(self, relation_id=None, duedate__lt=None, duedate__gte=None,
                **kwargs):
@@ -27,21 +32,18 @@ class Receivables(Manager):
             # any reason to prefer
             # 'read/financial/ReceivablesListByAccount?accountId=X' over
             # this.
-            relation_id = self._remote_guid(relation_id)
-            self._filter_append(kwargs, u'AccountId eq %s' % (relation_id,))
+            self._filter_append(kwargs, Q(AccountId=Guid(relation_id)))
 
         if duedate__lt is not None:
             # Not sure what the AgeGroup means in
             # ReceivablesListByAgeGroup, but we can certainly do
             # without.
-            duedate__lt = self._remote_datetime(duedate__lt)
-            self._filter_append(kwargs, u'DueDate lt %s' % (duedate__lt,))
+            self._filter_append(kwargs, Q(DueDate__lt=duedate__lt))
 
         if duedate__gte is not None:
             # Not sure what the AgeGroup means in
             # ReceivablesListByAgeGroup, but we can certainly do
             # without.
-            duedate__gte = self._remote_datetime(duedate__gte)
-            self._filter_append(kwargs, u'DueDate ge %s' % (duedate__gte,))
+            self._filter_append(kwargs, Q(DueDate__ge=duedate__gte))
 
         return super(Receivables, self).filter(**kwargs)
@@ -6,21 +6,30 @@ This file is part of the Exact Online REST API Library in Python
 (EORALP), licensed under the LGPLv3+.
 Copyright (C) 2015 Walter Doekes, OSSO B.V.
 """
-from .manager import Manager
+from .manager import Manager, to_unistr
+from .query import Q
 
 
 class Relations(Manager):
     resource = 'crm/Accounts'
+    bulk_resource = 'bulk/CRM/Accounts'
+    default_select = 'ID,Code,Name'
+    entity_type = 2  # in sync/Deleted
+    date_fields = (
+        'ControlledDate', 'Created', 'CustomerSince', 'EndDate', 'Modified',
+        'StartDate', 'StatusSince')
 
     def filter(self, relation_code=None, **kwargs):
-        # $select=ID,Code,Name
-        if 'select' not in kwargs:
-            kwargs['select'] = 'ID,Code,Name'
-
         if relation_code is not None:
-            remote_id = self._remote_relation_code(relation_code)
-            self._filter_append(kwargs, u'Code eq %s' % (remote_id,))
+            remote_code = self._remote_relation_code(relation_code)
+            self._filter_append(kwargs, Q(Code=remote_code))
         return super(Relations, self).filter(**kwargs)
 
+    def natural_key(self, natural_key_field, value):
+        # The codes are left padded with spaces to 18 positions remotely.
+        if natural_key_field == 'Code' and value is not None:
+            return to_unistr(value).lstrip()
+        return value
+
     def _remote_relation_code(self, code):
-        return u"'%18s'" % (code.replace("'", "''"),)
+        return u'%18s' % (code,)
@@ -7,15 +7,17 @@ This file is part of the Exact Online REST API Library in Python
 Copyright (C) 2018 Walter Doekes, OSSO B.V.
 """
 from .manager import Manager
+from .query import Guid, Q
 
 
 class SalesPriceListPeriods(Manager):
     resource = 'sales/SalesPriceListPeriods'
+    date_fields = ('Created', 'EndDate', 'Modified', 'StartDate')
     # https://start.exactonline.nl/docs/HlpRestAPIResourcesDetails.aspx?name=SalesSalesPriceListPeriods
 
     def filter(self, pricelist_id=None, **kwargs):
         if pricelist_id:
-            self._filter_append(kwargs, f"PriceList eq guid'{pricelist_id}'")
+            self._filter_append(kwargs, Q(PriceList=Guid(pricelist_id)))
 
         return super().filter(**kwargs)
 
@@ -7,20 +7,20 @@ This file is part of the Exact Online REST API Library in Python
 Copyright (C) 2018 Walter Doekes, OSSO B.V.
 """
 from .manager import Manager
+from .query import Guid, Q
 
 
 class SalesPriceListVolumeDiscounts(Manager):
     resource = 'sales/SalesPriceListVolumeDiscounts'
     # https://start.exactonline.co.uk/docs/HlpRestAPIResourcesDetails.aspx?
     #   name=SalesSalesPriceListVolumeDiscounts
+    default_select = (
+        'ID,BasePriceAmount,Item,ItemCode,Discount,NewPrice,Quantity')
+    decimal_fields = ('BasePriceAmount', 'Discount', 'NewPrice')
 
     def filter(self, pricelistperiod_id=None, **kwargs):
-        if 'select' not in kwargs:
-            kwargs['select'] = (
-                'ID,BasePriceAmount,Item,ItemCode,Discount,NewPrice,Quantity')
-
         if pricelistperiod_id:
             self._filter_append(
-                kwargs, f"PriceListPeriod eq guid'{pricelistperiod_id}'")
+                kwargs, Q(PriceListPeriod=Guid(pricelistperiod_id)))
 
         return super().filter(**kwargs)
@@ -13,11 +13,7 @@ class SupplierItems(Manager):
     # https://start.exactonline.co.uk/docs/HlpRestAPIResourcesDetails.aspx?
     #   name=LogisticsSupplierItem
     resource = 'logistics/SupplierItem'
-
-    def filter(self, **kwargs):
-        if 'select' not in kwargs:
-            kwargs['select'] = (
-                'ID,ItemCode,Supplier,SupplierDescription,'
-                'CountryOfOrigin,PurchasePrice')
-
-        return super().filter(**kwargs)
+    default_select = (
+        'ID,ItemCode,Supplier,SupplierDescription,CountryOfOrigin,'
+        'PurchasePrice')
+    decimal_fields = ('PurchasePrice',)
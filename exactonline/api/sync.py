@@ -0,0 +1,133 @@
+# vim: set ts=8 sw=4 sts=4 et ai tw=79:
+"""
+Incremental sync through the sync/ resources.
+
+Every record of a sync/ resource has a Timestamp (a row version) that
+increases whenever the record changes. Asking for Timestamp gt N returns
+only what changed after N, up to 1000 records per page. A SyncManager
+keeps that N, the cursor, in the storage (per division and resource)
+and moves it forward after every page:
+
+    def apply(records):
+        for record in records:
+            db.save(record)
+
+    api.syncaccounts.sync(apply)  # returns the number of records
+
+The first sync fetches everything; the next ones only the changes since
+the last. apply() is called for every page; the cursor is moved to the
+highest Timestamp of the page after apply() returns. If apply() raises
+(or the process dies), the next sync resumes after the last applied
+page, so a page may be applied twice, but is never skipped.
+
+Every consumer of the changes needs its own cursor, or they take the
+changes from each other. Pass a name if there are several, and always
+when you filter, because the changes that were filtered out are skipped
+for good:
+
+    api.syncitems.sync(update_webshop, name='webshop')
+    api.syncitems.sync(
+        update_prices, name='prices', filter=Q(IsSalesItem=True))
+
+Deletions are not in the sync/ resources, see sync/Deleted.
+
+This file is part of the Exact Online REST API Library in Python
+(EORALP), licensed under the LGPLv3+.
+Copyright (C) 2021 Walter Doekes, OSSO B.V.
+"""
+from threading import Lock
+
+from .limits import Limits
+from .manager import Manager
+from .query import Q
+
+
+class SyncManager(Manager):
+    """
+    Base class for the sync/ resources. Set resource and default_select
+    in your subclass.
+    """
+    # No sync/Resource(guid'...') addressing.
+    supports_key_lookup = False
+
+    def __init__(self, api):
+        super(SyncManager, self).__init__(api)
+        self._sync_lock = Lock()
+
+    def filter(self, timestamp_gt=None, **kwargs):
+        """
+        Like Manager.filter(), but only returns the records changed
+        after timestamp_gt, if it is set.
+        """
+        if timestamp_gt is not None:
+            self._filter_append(kwargs, Q(Timestamp__gt=int(timestamp_gt)))
+
+        return super(SyncManager, self).filter(**kwargs)
+
+    def get_cursor(self, name=None):
+        """
+        Return the Timestamp up to which the changes have been synced
+        (for the consumer called name).
+        """
+        storage = self._api.storage
+        return storage.get_sync_timestamp(
+            storage.get_division(), self._cursor_key(name))
+
+    def set_cursor(self, timestamp, name=None):
+        storage = self._api.storage
+        storage.set_sync_timestamp(
+            storage.get_division(), self._cursor_key(name), timestamp)
+
+    def reset_cursor(self, name=None):
+        """
+        Start over: the next sync() fetches all records.
+        """
+        self.set_cursor(1, name=name)
+
+    def iter_changes(self, timestamp_gt, **kwargs):
+        """
+        Yield the records changed after timestamp_gt, one page (a list)
+        at a time. Takes the same arguments as filter(); the Timestamp
+        is added to the $select if it's missing.
+
+        The iteration_limit does not apply: a first sync of a large
+        administration takes many pages, and it resumes from the cursor
+        anyway. Pass limits to stop early; the next sync continues.
+        """
+        select = kwargs.get('select') or self.default_select
+        if 'Timestamp' not in select.split(','):
+            select = 'Timestamp,' + select
+        kwargs['select'] = select
+        if not kwargs.get('limits'):
+            kwargs['limits'] = Limits()  # no limits, no iteration_limit
+
+        pages = self.filter(timestamp_gt=timestamp_gt, pages=True, **kwargs)
+        for page in pages:
+            page = list(page)
+            if page:
+                yield page
+
+    def sync(self, apply, name=None, **kwargs):
+        """
+        Call apply(records) for every page of records that changed since
+        the cursor of name, and move the cursor after every page. Takes
+        the same arguments as filter(), except the timestamp_gt; a
+        filter requires a name. Returns the number of records.
+        """
+        if kwargs.get('filter') and name is None:
+            raise ValueError(
+                'A filtered sync needs its own cursor, pass a name')
+
+        count = 0
+        # Don't let two syncs move the same cursor.
+        with self._sync_lock:
+            for page in self.iter_changes(self.get_cursor(name), **kwargs):
+                apply(page)
+                self.set_cursor(max(i['Timestamp'] for i in page), name=name)
+                count += len(page)
+        return count
+
+    def _cursor_key(self, name):
+        if name is None:
+            return self.resource
+        return '%s#%s' % (self.resource, name)
@@ -0,0 +1,20 @@
+# vim: set ts=8 sw=4 sts=4 et ai tw=79:
+"""
+Helper for SyncAccounts resources.
+
+This file is part of the Exact Online REST API Library in Python
+(EORALP), licensed under the LGPLv3+.
+Copyright (C) 2021 Walter Doekes, OSSO B.V.
+"""
+from .sync import SyncManager
+
+
+class SyncAccounts(SyncManager):
+    # https://start.exactonline.co.uk/docs/HlpRestAPIResourcesDetails.aspx?
+    #   name=SyncCRMAccounts
+    resource = 'sync/CRM/Accounts'
+    entity_type = 2  # in sync/Deleted
+    default_select = (
+        'Timestamp,ID,Code,Name,Status,Blocked,Email,City,Country,VATNumber,'
+        'Modified')
+    date_fields = ('Modified',)
@@ -0,0 +1,20 @@
+# vim: set ts=8 sw=4 sts=4 et ai tw=79:
+"""
+Helper for SyncContacts resources.
+
+This file is part of the Exact Online REST API Library in Python
+(EORALP), licensed under the LGPLv3+.
+Copyright (C) 2021 Walter Doekes, OSSO B.V.
+"""
+from .sync import SyncManager
+
+
+class SyncContacts(SyncManager):
+    # https://start.exactonline.co.uk/docs/HlpRestAPIResourcesDetails.aspx?
+    #   name=SyncCRMContacts
+    resource = 'sync/CRM/Contacts'
+    entity_type = 5  # in sync/Deleted
+    default_select = (
+        'Timestamp,ID,Account,FirstName,LastName,FullName,Email,Phone,'
+        'Modified')
+    date_fields = ('Modified',)
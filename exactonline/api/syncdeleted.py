@@ -0,0 +1,55 @@
+# vim: set ts=8 sw=4 sts=4 et ai tw=79:
+"""
+Helper for the sync/Deleted resource.
+
+Exact keeps a record of the deletions: the GUID (EntityKey) and the
+kind (EntityType) of every deleted record. apply_tombstones() pages
+through the deletions since its cursor (see api.sync) and drops those
+records from the caches, key indexes and mirrors of the managers:
+
+    api.syncdeleted.apply_tombstones([api.relations, api.items])
+
+The managers must have an entity_type. The cursor is kept per name
+(see api.sync), so pass all managers you keep copies for in a single
+call, and give other consumers of sync/Deleted a name of their own.
+
+This file is part of the Exact Online REST API Library in Python
+(EORALP), licensed under the LGPLv3+.
+Copyright (C) 2021 Walter Doekes, OSSO B.V.
+"""
+from .sync import SyncManager
+
+
+class SyncDeleted(SyncManager):
+    # https://start.exactonline.co.uk/docs/HlpRestAPIResourcesDetails.aspx?
+    #   name=SyncDeleted
+    # EntityType: 1 = TransactionLines, 2 = Accounts, 3 = Addresses,
+    # 4 = Attachments, 5 = Contacts, 6 = Documents, 7 = GLAccounts,
+    # 8 = ItemPrices, 9 = Items, 10 = PaymentTerms, ...
+    resource = 'sync/Deleted'
+    default_select = 'Timestamp,ID,EntityKey,EntityType,DeletedDate'
+    date_fields = ('DeletedDate',)
+
+    def apply_tombstones(self, managers, name='tombstones'):
+        """
+        Call forget() on the managers for the records that were deleted
+        since the cursor of name. Returns the number of deletions seen
+        (for all entity types).
+        """
+        by_type = {}
+        for manager in managers:
+            if manager.entity_type is None:
+                raise ValueError(
+                    '%s has no entity_type' % (type(manager).__name__,))
+            by_type.setdefault(manager.entity_type, []).append(manager)
+
+        def apply(records):
+            keys = {}
+            for record in records:
+                keys.setdefault(record['EntityType'], []).append(
+                    record['EntityKey'])
+            for entity_type, guids in keys.items():
+                for manager in by_type.get(entity_type, ()):
+                    manager.forget(guids)
+
+        return self.sync(apply, name=name)
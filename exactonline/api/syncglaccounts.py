@@ -0,0 +1,19 @@
+# vim: set ts=8 sw=4 sts=4 et ai tw=79:
+"""
+Helper for SyncGLAccounts resources.
+
+This file is part of the Exact Online REST API Library in Python
+(EORALP), licensed under the LGPLv3+.
+Copyright (C) 2021 Walter Doekes, OSSO B.V.
+"""
+from .sync import SyncManager
+
+
+class SyncGLAccounts(SyncManager):
+    # https://start.exactonline.co.uk/docs/HlpRestAPIResourcesDetails.aspx?
+    #   name=SyncFinancialGLAccounts
+    resource = 'sync/Financial/GLAccounts'
+    entity_type = 7  # in sync/Deleted
+    default_select = (
+        'Timestamp,ID,Code,Description,Type,BalanceType,Modified')
+    date_fields = ('Modified',)
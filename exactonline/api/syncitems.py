@@ -0,0 +1,21 @@
+# vim: set ts=8 sw=4 sts=4 et ai tw=79:
+"""
+Helper for SyncItems resources.
+
+This file is part of the Exact Online REST API Library in Python
+(EORALP), licensed under the LGPLv3+.
+Copyright (C) 2021 Walter Doekes, OSSO B.V.
+"""
+from .sync import SyncManager
+
+
+class SyncItems(SyncManager):
+    # https://start.exactonline.co.uk/docs/HlpRestAPIResourcesDetails.aspx?
+    #   name=SyncLogisticsItems
+    resource = 'sync/Logistics/Items'
+    entity_type = 9  # in sync/Deleted
+    default_select = (
+        'Timestamp,ID,Code,Description,IsSalesItem,Unit,CostPriceStandard,'
+        'Modified')
+    date_fields = ('Modified',)
+    decimal_fields = ('CostPriceStandard',)
@@ -0,0 +1,27 @@
+# vim: set ts=8 sw=4 sts=4 et ai tw=79:
+"""
+Helper for SyncTransactionLines resources.
+
+These are the lines of all financial entries. For the sales entries,
+filter on their Type (20 is a sales entry, 21 a sales credit note):
+
+    api.synctransactionlines.sync(apply, filter=Q(Type__in=(20, 21)))
+
+This file is part of the Exact Online REST API Library in Python
+(EORALP), licensed under the LGPLv3+.
+Copyright (C) 2021 Walter Doekes, OSSO B.V.
+"""
+from .sync import SyncManager
+
+
+class SyncTransactionLines(SyncManager):
+    # https://start.exactonline.co.uk/docs/HlpRestAPIResourcesDetails.aspx?
+    #   name=SyncFinancialTransactionLines
+    resource = 'sync/Financial/TransactionLines'
+    entity_type = 1  # in sync/Deleted
+    default_select = (
+        'Timestamp,ID,EntryID,EntryNumber,JournalCode,Type,Date,FinancialYear,'
+        'FinancialPeriod,GLAccount,GLAccountCode,Account,AmountDC,AmountVATDC,'
+        'Description,Modified')
+    date_fields = ('Date', 'Modified')
+    decimal_fields = ('AmountDC', 'AmountVATDC')
@@ -7,68 +7,119 @@ This file is part of the Exact Online REST API Library in Python
 (EORALP), licensed under the LGPLv3+.
 Copyright (C) 2015-2018 Walter Doekes, OSSO B.V.
 """
+from ..jsonstream import ResultStream
 
 
 class Unwrap(object):
     def rest(self, request):
+        # GET resource/$count returns a number.
+        if request.method == 'GET' and request.is_count:
+            return int(super(Unwrap, self).rest(request))
+
+        # GET methods return one or more pages.
+        if request.method == 'GET':
+            ret = []
+            for page in self.rest_pages(request):
+                ret.extend(page)
+            return ret
+
+        decoded = super(Unwrap, self).rest(request)
+
+        # DELETE and PUT methods return None.
+        if not decoded:
+            assert request.method in ('DELETE', 'PUT'), request.method
+            return decoded
+
+        # POST methods return a nice dictionary inside of 'd'.
+        assert request.method == 'POST', request.method
+        return self._rest_to_result_data(decoded)
+
+    def rest_pages(self, request):
+        """
+        Like rest(), but for GET requests only: yields the results one
+        page at a time. The next page is not fetched until the previous
+        one has been consumed, so the caller never needs to hold more
+        than one page in memory.
+
+        If the request has limits (see api.limits), those replace the
+        iteration_limit: when one is reached, we stop cleanly and leave
+        the request for the next page in limits.continuation.
+        """
+        assert request.method == 'GET', request.method
         iteration = 0
-        ret = []
 
-        iteration_limit = self.storage.get_iteration_limit()
+        limits = request.limits
+        if limits:
+            limits.start()
+        else:
+            iteration_limit = self.storage.get_iteration_limit()
 
         while request:
-            if iteration >= iteration_limit:
+            if limits:
+                reached = iteration and limits.check()
+                if reached:
+                    limits.stop(reached, request)
+                    return
+            elif iteration >= iteration_limit:
                 raise ValueError(
                     'Iteration %d limit reached! Last resource %r' % (
                         iteration, request.resource))
 
             decoded = super(Unwrap, self).rest(request)
 
-            # DELETE and PUT methods return None.
-            if not decoded:
-                assert request.method in ('DELETE', 'PUT'), request.method
-                assert iteration == 0, iteration
-                return decoded
-
-            # GET/POST methods return a host of different types.
-            result_data = decoded.pop(u'd', None)
-            if result_data is None or decoded:
-                raise ValueError(
-                    'Expected *only* "d" in response, got this: '
-                    'response=%r, d=%r' % (decoded, result_data))
-
-            # POST methods return a nice dictionary inside of 'd'.
-            if request.method == 'POST':
-                assert iteration == 0, iteration
-                return result_data
-
-            # GET methods...
-            assert request.method == 'GET'
-
-            if isinstance(result_data, dict):
+            if isinstance(decoded, ResultStream):
+                # The results are parsed while the caller consumes them.
+                # The __next is only known at the end of the document.
+                yield decoded
+                resource = self._rest_stream_to_next(decoded)
+                count = decoded.count
+            else:
+                result_data = self._rest_to_result_data(decoded)
                 result_data, resource = self._rest_to_result_data_and_next(
-                    result_data)
-                ret.extend(result_data)
+                    result_data, entity=request.entity)
+                yield result_data
+                count = len(result_data)
 
-                if resource:
-                    request = request.update(resource=resource)  # next request
-                else:
-                    request = None  # no next
+            if limits:
+                limits.add_page(count)
 
-            elif isinstance(result_data, list):
-                assert iteration == 0, iteration
-                ret = result_data
-                request = None  # no next
+            if resource:
+                request = request.update(resource=resource)  # next request
             else:
-                raise ValueError(
-                    'Expected *list* or *dict* in "d", got this: d=%r' % (
-                        result_data,))
+                request = None  # no next
 
             iteration += 1
 
-        return ret
+    def _rest_stream_to_next(self, stream):
+        next_ = stream.finish()
+        unexpected = set(stream.envelope) - set([u'__next'])
+        if not stream.has_results or unexpected:
+            raise ValueError(
+                'Expected *only* "results" in "d", got this: d=%r' % (
+                    stream.envelope,))
+        return next_
+
+    def _rest_to_result_data(self, decoded):
+        # GET/POST methods return a host of different types.
+        result_data = decoded.pop(u'd', None)
+        if result_data is None or decoded:
+            raise ValueError(
+                'Expected *only* "d" in response, got this: '
+                'response=%r, d=%r' % (decoded, result_data))
+        return result_data
+
+    def _rest_to_result_data_and_next(self, result_data, entity=False):
+        if isinstance(result_data, list):
+            return result_data, None  # no next
+        if not isinstance(result_data, dict):
+            raise ValueError(
+                'Expected *list* or *dict* in "d", got this: d=%r' % (
+                    result_data,))
+
+        if entity and u'results' not in result_data:
+            # A single entity, from a resource(guid'...') lookup.
+            return [result_data], None
 
-    def _rest_to_result_data_and_next(self, result_data):
         results = result_data.pop(u'results', None)
         next_ = result_data.pop(u'__next', None)
         if results is None or result_data:
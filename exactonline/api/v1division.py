@@ -18,6 +18,12 @@ class V1DivisionError(ExactOnlineError):
 
 class V1Division(object):
     def restv1(self, request):
+        return self.rest(self._v1request(request))
+
+    def restv1_pages(self, request):
+        return self.rest_pages(self._v1request(request))
+
+    def _v1request(self, request):
         try:
             division = self.storage.get_division()
         except MissingSetting:
@@ -26,8 +32,7 @@ class V1Division(object):
             raise V1DivisionError('Division unset/blank in config')
 
         urlbase = 'v1/%d/' % (division,)
-        request = request.update(resource=urljoin(urlbase, request.resource))
-        return self.rest(request)
+        return request.update(resource=urljoin(urlbase, request.resource))
 
     def get_divisions(self):
         """
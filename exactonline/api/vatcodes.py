@@ -7,25 +7,19 @@ This file is part of the Exact Online REST API Library in Python
 Copyright (C) 2017 Walter Doekes, OSSO B.V.
 """
 from .manager import Manager
+from .query import Q
 
 
 class VatCodes(Manager):
     resource = 'vat/VATCodes'
+    default_select = 'ID,Code,Percentage'
 
     def filter(self, vat_code=None, **kwargs):
-        # $select=ID,Code,Percentage
-        if 'select' not in kwargs:
-            kwargs['select'] = 'ID,Code,Percentage'
-
         if vat_code is not None:
-            remote_id = self._remote_vat_code(vat_code)
-            self._filter_append(kwargs, u'Code eq %s' % (remote_id,))
+            self._filter_append(kwargs, Q(Code=vat_code))
         return super(VatCodes, self).filter(**kwargs)
 
     def get_percentage(self, vat_code=None, **kwargs):
         vat = super(VatCodes, self).get(
             vat_code=vat_code, select='Percentage', **kwargs)
         return vat['Percentage']
-
-    def _remote_vat_code(self, code):
-        return u"'%s'" % (code.replace("'", "''"),)
@@ -0,0 +1,77 @@
+# vim: set ts=8 sw=4 sts=4 et ai tw=79:
+"""
+Run independent API calls concurrently.
+
+The calls share the api object. The RateLimiter and the token refresh
+(see Autorefresh) are safe to use from multiple threads, so the workers
+back off together when the rate limit is near.
+
+This file is part of the Exact Online REST API Library in Python
+(EORALP), licensed under the LGPLv3+.
+Copyright (C) 2021 Walter Doekes, OSSO B.V.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BulkResult(object):
+    """
+    The outcome for one item of a bulk operation: the return value in
+    result, or the exception in error.
+    """
+    __slots__ = ('item', 'result', 'error')
+
+    def __init__(self, item, result=None, error=None):
+        self.item = item
+        self.result = result
+        self.error = error
+
+    def __repr__(self):
+        if self.error is not None:
+            return '<BulkResult(%r, error=%r)>' % (self.item, self.error)
+        return '<BulkResult(%r, result=%r)>' % (self.item, self.result)
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def max_workers_for(api, max_workers):
+    """
+    Return max_workers, lowered to the number of calls we have left
+    according to the rate limiter (if the api has one).
+    """
+    limiter = getattr(api, 'limiter', None)
+    remaining = limiter and limiter.remaining()
+    if remaining is not None:
+        max_workers = min(max_workers, remaining)
+    return max(max_workers, 1)
+
+
+def run_concurrently(func, items, max_workers):
+    """
+    Call func(item) for every item, using at most max_workers threads.
+    Returns the results in the order of the items. The first exception
+    is raised, after all calls are done.
+    """
+    items = list(items)
+    if len(items) <= 1 or max_workers <= 1:
+        return [func(item) for item in items]
+
+    max_workers = min(max_workers, len(items))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(func, item) for item in items]
+    return [future.result() for future in futures]
+
+
+def run_each(func, items, max_workers):
+    """
+    Like run_concurrently(), but an exception does not stop the others:
+    returns a BulkResult for every item, in order.
+    """
+    def call(item):
+        try:
+            return BulkResult(item, result=func(item))
+        except Exception as e:
+            return BulkResult(item, error=e)
+
+    return run_concurrently(call, items, max_workers)
@@ -7,11 +7,32 @@ This file is part of the Exact Online REST API Library in Python
 Copyright (C) 2016-2021 Walter Doekes, OSSO B.V.
 """
 import json
+import re
+from datetime import date, datetime
 from time import time
 from unittest import TestCase
+try:
+    from urllib.parse import unquote
+except ImportError:  # python2
+    from urllib import unquote
 
 from .api import ExactApi
-from .http import opt_secure
+from .api.advisor import SelectAdvisor
+from .api.autorefresh import Autorefresh
+from .api.cache import MemoryCache
+from .api.invoices import Invoices
+from .api.ledgeraccounts import LedgerAccounts
+from .api.limits import Limits
+from .api.query import Guid, Q
+from .api.receivables import Receivables
+from .api.relations import Relations
+from .api.syncaccounts import SyncAccounts
+from .api.syncdeleted import SyncDeleted
+from .api.unwrap import Unwrap
+from .api.vatcodes import VatCodes
+from .exceptions import ObjectDoesNotExist
+from .http import HTTPError, opt_secure
+from .resource import GET
 from .storage import ExactOnlineConfig, MissingSetting
 
 from .http_test import HttpTestResponse, HttpTestServer
@@ -88,6 +109,25 @@ class ApiTestCase(TestCase):
         server.join()
         self.assertEqual(res, data['d']['results'])
 
+    def test_call_streamed(self):
+        data = {
+            'd': {'results': [
+                {'name': 'invoice1', 'identifier': 4},
+                {'name': 'invoice2', 'identifier': 44},
+            ]},
+        }
+        jsondata = json.dumps(data)
+
+        server = HttpTestServer()
+        server.add_response(HttpTestResponse('GET', '200', jsondata))
+        server.start()
+
+        api = self.get_api(server_port=server.port)
+        api.stream_results = True
+        res = api.invoices.filter(filter=u"Currency eq '\u20ac'", top=5)
+        server.join()
+        self.assertEqual(res, data['d']['results'])
+
     def test_autorefresh(self):
         data = {
             'd': {'results': [
@@ -133,3 +173,591 @@ class ApiTestCase(TestCase):
 
         # And we still get the correct results.
         self.assertEqual(res, data['d']['results'])
+
+    def test_autorefresh_401_once(self):
+        class Base(object):
+            def rest(self, request):
+                token = self.storage.get_access_token()
+                self.tokens.append(token)
+                if token == 'OLD':
+                    # Meanwhile, another thread got a 401 and refreshed.
+                    self.storage.set_access_token('NEW')
+                    raise HTTPError(
+                        request, 401, 'Unauthorized', {}, '', 'GET', None)
+                return 'ok'
+
+        class Api(Autorefresh, Base):
+            def refresh_token(self):
+                self.refreshed += 1
+
+        api = Api()
+        api.storage = self.MemoryStorage(server_port=0)
+        api.storage.set_access_token('OLD')
+        api.storage.set_access_expiry(int(time()) + 360)
+        api.tokens, api.refreshed = [], 0
+
+        self.assertEqual(api.rest(None), 'ok')
+        self.assertEqual(api.tokens, ['OLD', 'NEW'])
+        self.assertEqual(api.refreshed, 0)
+
+
+class RecordingApi(object):
+    """
+    Stand-in for the ExactApi that records the restv1() requests and
+    returns canned results.
+    """
+    class storage(object):
+        @staticmethod
+        def get_division():
+            return 1
+
+    def __init__(self, *results):
+        self.requests = []
+        self.results = list(results)
+
+    def restv1(self, request):
+        self.requests.append(request)
+        return self.results.pop(0) if self.results else []
+
+    def restv1_pages(self, request):
+        # Every result is a page.
+        self.requests.append(request)
+        while self.results:
+            yield self.results.pop(0)
+
+
+class EchoApi(RecordingApi):
+    """
+    Stand-in for the ExactApi that returns a record for every
+    "Field eq 'value'" (or guid'value') in the $filter. Safe to use from
+    threads.
+    """
+    def restv1(self, request):
+        self.requests.append(request)
+        filter_ = unquote(request.resource)
+        return [
+            {'ID': value, 'Code': value}
+            for value in re.findall(r" eq (?:guid)?'([^']*)'", filter_)]
+
+
+class WritableApi(RecordingApi):
+    """
+    RecordingApi that also records POST/PUT/DELETE requests; those
+    return the request data, not a canned result. POSTs get ID 'new'.
+    """
+    def restv1(self, request):
+        if request.method == 'POST':
+            self.requests.append(request)
+            return dict(request.data, ID='new')
+        if request.method != 'GET':
+            self.requests.append(request)
+            return request.data
+        return super(WritableApi, self).restv1(request)
+
+
+class ManagerTestCase(TestCase):
+    def test_bulk_routing(self):
+        api = RecordingApi()
+        relations = Relations(api)
+
+        relations.all()
+        relations.filter(relation_code='123')
+        relations.filter(top=2)
+        relations.filter(select='ID,BankAccounts/IBAN')
+        self.assertEqual(
+            [i.resource.split('?')[0] for i in api.requests], [
+                'bulk/CRM/Accounts', 'bulk/CRM/Accounts',
+                'crm/Accounts', 'crm/Accounts'])
+
+        # No bulk counterpart.
+        Invoices(api).filter(select='EntryID')
+        self.assertEqual(
+            api.requests[-1].resource,
+            'salesentry/SalesEntries?$select=EntryID')
+
+    def test_flat_filter(self):
+        api = RecordingApi()
+        Invoices(api).filter(
+            filter=u"Currency eq 'EUR'", invoice_number='F1',
+            reporting_period=date(2021, 2, 1))
+        self.assertEqual(
+            unquote(api.requests[0].resource),
+            u"salesentry/SalesEntries?$filter=(Currency eq 'EUR') and "
+            u"YourRef eq 'F1' and ReportingYear eq 2021 and "
+            u"ReportingPeriod eq 2")
+
+    def test_pages(self):
+        api = RecordingApi([{'ID': 1}, {'ID': 2}], [{'ID': 3}])
+        pages = Relations(api).filter(pages=True)
+        self.assertEqual(api.requests, [])  # lazy
+        self.assertEqual(list(pages), [[{'ID': 1}, {'ID': 2}], [{'ID': 3}]])
+
+    def test_limits(self):
+        class CannedRawApi(RecordingApi):
+            def rest(self, request):
+                self.requests.append(request)
+                return self.results.pop(0)
+
+        class PagedApi(Unwrap, CannedRawApi):
+            # Unwrap on top of canned {"d": {"results": ...}} documents.
+            def restv1(self, request):
+                return self.rest(request)
+
+            def restv1_pages(self, request):
+                return self.rest_pages(request)
+
+        def page(ids, next_):
+            return {'d': {
+                'results': [{'ID': i} for i in ids], '__next': next_}}
+
+        api = PagedApi(page([1, 2], 'p2'), page([3, 4], 'p3'), page([5], None))
+        relations = Relations(api)
+
+        limits = Limits(records=3)
+        ret = relations.filter(limits=limits)
+        self.assertEqual([i['ID'] for i in ret], [1, 2, 3, 4])
+        self.assertEqual(limits.reached, 'records')
+        self.assertEqual(limits.continuation.resource, 'p3')
+
+        ret = relations.resume(limits.continuation)
+        self.assertEqual([i['ID'] for i in ret], [5])
+        self.assertIsNone(limits.reached)
+        self.assertIsNone(limits.continuation)
+
+    def test_filter_in(self):
+        api = EchoApi()
+        ledgeraccounts = LedgerAccounts(api)
+        ledgeraccounts.max_url_length = 150
+
+        codes = ['%04d' % (i,) for i in range(50)]
+        ret = ledgeraccounts.filter(code__in=(codes + codes[:10]))
+        self.assertEqual(sorted(i['Code'] for i in ret), codes)
+        self.assertGreater(len(api.requests), 1)
+        for request in api.requests:
+            # The path and $select count too.
+            self.assertIn('$select=ID%2CCode', request.resource)
+            self.assertLessEqual(len(request.resource), 150)
+
+        # Nothing to look for, nothing to ask.
+        api.requests = []
+        self.assertEqual(ledgeraccounts.filter(code__in=[]), [])
+        self.assertEqual(api.requests, [])
+
+        # Chunks and $top don't mix.
+        with self.assertRaises(ValueError):
+            ledgeraccounts.filter(code__in=codes, top=5)
+        ret = ledgeraccounts.filter(code__in=codes[:2], top=5)
+        self.assertEqual(len(ret), 2)
+
+    def test_filter_in_merge(self):
+        api = EchoApi()
+        relations = Relations(api)
+        relations.max_url_length = 60
+        ret = relations.filter_in(
+            'Code', ['1', '2', '3'], filter="Code eq '1'")
+        # The extra filter yields ID 1 for every chunk; it's returned once.
+        self.assertEqual(sorted(i['ID'] for i in ret), ['1', '2', '3'])
+        self.assertGreater(len(api.requests), 1)
+
+    def test_in_bulk(self):
+        api = EchoApi()
+        relations = Relations(api)
+        relations.max_url_length = 200
+
+        guids = [
+            'abcdef%02d-0000-0000-0000-000000000000' % (i,)
+            for i in range(10)]
+        guids.append(guids[0].upper())
+        ret = relations.in_bulk(guids, select='Name')
+        self.assertEqual(sorted(ret.keys()), sorted(guids))
+        self.assertEqual(ret[guids[-1]]['ID'], guids[0])
+        self.assertGreater(len(api.requests), 1)
+        self.assertLess(len(api.requests), 10)
+        for request in api.requests:
+            self.assertTrue(request.resource.startswith(
+                'bulk/CRM/Accounts?$select=ID%2CName&'), request.resource)
+
+    def test_get_by_id(self):
+        guid = 'abcdef00-0000-0000-0000-000000000000'
+        api = RecordingApi(*([[{'ID': guid}]] * 4))
+        relations = Relations(api)
+
+        self.assertEqual(relations.get_by_id(guid)['ID'], guid)
+        relations.get(filter=Q(ID=Guid(guid)), select='ID,Name')
+        relations.get(filter="ID eq guid'%s'" % (guid,))
+        self.assertEqual([i.resource for i in api.requests], [
+            "crm/Accounts(guid'%s')?$select=ID%%2CCode%%2CName" % (guid,),
+            "crm/Accounts(guid'%s')?$select=ID%%2CName" % (guid,),
+            "crm/Accounts(guid'%s')?$select=ID%%2CCode%%2CName" % (guid,)])
+
+        # Anything else is a regular query.
+        relations.get(filter=Q(ID=Guid(guid), Name='x'))
+        self.assertIn('$top=2', api.requests[-1].resource)
+
+        # As are lookups on resources that don't support addressing.
+        api.results = [[{'ID': guid}]]
+        SyncAccounts(api).get(filter=Q(ID=Guid(guid)))
+        self.assertIn(
+            "sync/CRM/Accounts?$top=2&$filter=", api.requests[-1].resource)
+        api.results = [[{'ID': guid}]]
+        Receivables(api).get(filter=Q(ID=Guid(guid)))
+        self.assertIn(
+            'read/financial/ReceivablesList?$top=2&$filter=',
+            api.requests[-1].resource)
+
+    def test_get_by_id_not_found(self):
+        class NotFoundApi(RecordingApi):
+            def restv1(self, request):
+                raise HTTPError(
+                    request.resource, 404, 'Not Found', {}, '', 'GET', None)
+
+        relations = Relations(NotFoundApi())
+        self.assertRaises(
+            ObjectDoesNotExist, relations.get_by_id,
+            'abcdef00-0000-0000-0000-000000000000')
+
+    def test_unwrap_entity(self):
+        # A resource(guid'...') lookup returns the entity in "d".
+        ret = Unwrap()._rest_to_result_data_and_next(
+            {'ID': 'x'}, entity=True)
+        self.assertEqual(ret, ([{'ID': 'x'}], None))
+        # Anywhere else, that's unexpected.
+        self.assertRaises(
+            ValueError, Unwrap()._rest_to_result_data_and_next, {'ID': 'x'})
+
+    def test_count_and_exists(self):
+        api = RecordingApi(42, [])
+        relations = Relations(api)
+
+        self.assertEqual(relations.count(relation_code='1'), 42)
+        self.assertEqual(
+            unquote(api.requests[0].resource),
+            "crm/Accounts/$count?$filter=Code eq '                 1'")
+        self.assertTrue(api.requests[0].is_count)
+
+        self.assertFalse(relations.exists(relation_code='1'))
+        self.assertIn('$top=1', api.requests[1].resource)
+        self.assertIn('$select=ID', api.requests[1].resource)
+        self.assertFalse(relations.exists(top=5, select='ID,Name'))
+        self.assertIn('$top=1&$select=ID', api.requests[2].resource)
+
+        # Counts of chunked lookups are added up.
+        api = RecordingApi(1, 2)
+        ledgeraccounts = LedgerAccounts(api)
+        ledgeraccounts.max_workers = 1
+        ledgeraccounts.max_url_length = 30
+        self.assertEqual(ledgeraccounts.count(code__in=['1', '2']), 3)
+        self.assertNotIn('$select', api.requests[0].resource)
+
+    def test_unwrap_count(self):
+        class RawApi(object):
+            def rest(self, request):
+                return 7
+
+        class Api(Unwrap, RawApi):
+            pass
+
+        self.assertEqual(Api().rest(GET('crm/Accounts/$count')), 7)
+
+    def test_lazy(self):
+        api = RecordingApi([{'ID': 1}, {'ID': 2}], [{'ID': 3}])
+        relations = Relations(api)
+
+        qs = relations.filter(lazy=True, relation_code='1')
+        qs = qs.filter(Q(Name='x'), select='ID,Name')[5:15][1:]
+        self.assertEqual(api.requests, [])
+        self.assertEqual([i['ID'] for i in qs], [1, 2, 3])  # streamed
+        self.assertEqual(
+            unquote(api.requests[0].resource),
+            u"crm/Accounts?$select=ID,Name&$filter=Code eq "
+            u"'                 1' and Name eq 'x'&$skip=6&$top=9")
+
+        # An empty __in is empty without asking.
+        api = RecordingApi()
+        qs = LedgerAccounts(api).filter(lazy=True, code__in=[])
+        self.assertEqual(list(qs), [])
+        self.assertEqual((qs.count(), qs.exists()), (0, False))
+        self.assertEqual(
+            Relations(api).filter(filter=Q(ID__in=[]) & Q(Name='x')), [])
+        self.assertEqual(api.requests, [])
+
+        api = RecordingApi([{'ID': 1}])
+        qs = Relations(api).all(lazy=True)
+        self.assertEqual(qs[3]['ID'], 1)
+        self.assertIn('$skip=3&$top=1', api.requests[0].resource)
+        self.assertEqual(list(qs[2:2]), [])
+        self.assertEqual(len(api.requests), 1)
+
+        api = RecordingApi(10, [{'ID': 1}])
+        qs = Relations(api).all(lazy=True)[8:]
+        self.assertEqual(qs.count(), 2)
+        self.assertIn('/$count', api.requests[0].resource)
+        self.assertTrue(qs.exists())
+        self.assertIn('$select=ID&$skip=8&$top=1', api.requests[1].resource)
+
+    def test_cache(self):
+        api = WritableApi([{'ID': 'a'}], [{'ID': 'b'}])
+        relations = Relations(api)
+        relations.cache = MemoryCache()
+
+        self.assertEqual(relations.filter(relation_code='1'), [{'ID': 'a'}])
+        self.assertEqual(relations.filter(relation_code='1'), [{'ID': 'a'}])
+        self.assertEqual(len(api.requests), 1)
+
+        relations.update('a', {'Name': 'A'})
+        self.assertEqual(relations.filter(relation_code='1'), [{'ID': 'b'}])
+        self.assertEqual(len(api.requests), 3)
+
+        # Decoded differently: not from (or into) the cache.
+        api.results = [[{'ID': 'c'}]]
+        self.assertEqual(
+            relations.filter(relation_code='1', decoder=json.JSONDecoder()),
+            [{'ID': 'c'}])
+        self.assertEqual(len(api.requests), 4)
+        self.assertEqual(relations.filter(relation_code='1'), [{'ID': 'b'}])
+
+    def test_negative_cache(self):
+        api = WritableApi([], [], [{'ID': 'a'}])
+        relations = Relations(api)
+        relations.negative_cache_ttl = 60
+
+        self.assertRaises(ObjectDoesNotExist, relations.get, relation_code='1')
+        self.assertRaises(ObjectDoesNotExist, relations.get, relation_code='1')
+        self.assertEqual(len(api.requests), 1)
+        self.assertRaises(ObjectDoesNotExist, relations.get, relation_code='2')
+        self.assertEqual(len(api.requests), 2)
+
+        relations.create({'Code': '1'})
+        self.assertEqual(relations.get(relation_code='1'), {'ID': 'a'})
+        self.assertEqual(len(api.requests), 4)
+
+    def test_bulk(self):
+        class FlakyApi(WritableApi):
+            def restv1(self, request):
+                for key, codes in self.failures.items():
+                    if request.resource.endswith(key) and codes:
+                        self.requests.append(request)
+                        raise HTTPError(
+                            request.resource, codes.pop(), 'Error', {}, '',
+                            request.method, None)
+                return super(FlakyApi, self).restv1(request)
+
+        api = FlakyApi()
+        # PUT b fails once, PUT c and all POSTs always.
+        api.failures = {
+            "b')": [503], "c')": [400] * 9, '/Accounts': [500] * 9}
+        relations = Relations(api)
+        relations.retry_delay = 0
+
+        ret = relations.bulk_update(
+            [('a', {'Name': 'A'}), ('b', {'Name': 'B'}), ('c', {})])
+        self.assertEqual([i.ok for i in ret], [True, True, False])
+        self.assertEqual(ret[1].result, {'Name': 'B'})
+        self.assertEqual(ret[2].error.code, 400)
+        self.assertEqual(len(api.requests), 4)  # b twice
+
+        api.requests = []
+        ret = relations.bulk_create([{'Code': '1'}])
+        self.assertEqual(ret[0].error.code, 500)
+        self.assertEqual(len(api.requests), 1)  # not retried
+
+        api.requests = []
+        ret = relations.bulk_delete(['a', 'd'])
+        self.assertEqual([i.ok for i in ret], [True, True])
+        self.assertEqual(len(api.requests), 2)
+
+        # Deleted remotely: failing local cleanup is only logged.
+        class BrokenMirror(object):
+            def delete(self, manager, keys):
+                raise ValueError('boom')
+
+        relations.mirror = BrokenMirror()
+        with self.assertLogs('exactonline.api.manager', 'ERROR'):
+            ret = relations.bulk_delete(['e'])
+        self.assertTrue(ret[0].ok)
+
+    def test_upsert(self):
+        api = WritableApi([{'ID': 'g1', 'Code': '                 1'}])
+        relations = Relations(api)
+
+        ret = relations.upsert('Code', [
+            {'Code': '1', 'Name': 'One'}, {'Code': '2', 'Name': 'Two'}])
+        self.assertEqual([i.ok for i in ret], [True, True])
+        self.assertEqual(ret[1].item, {'Code': '2', 'Name': 'Two'})
+        self.assertEqual(
+            sorted((i.method, i.resource) for i in api.requests), [
+                ('GET', 'bulk/CRM/Accounts?$select=ID%2CCode'),
+                ('POST', 'crm/Accounts'),
+                ('PUT', "crm/Accounts(guid'g1')")])
+        self.assertEqual(
+            relations.key_index('Code'), {'1': 'g1', '2': 'new'})
+
+        # The index is kept; no more scans.
+        api.requests = []
+        relations.upsert('Code', [{'Code': '2', 'Name': 'Deux'}])
+        relations.delete('g1')
+        self.assertEqual(
+            [i.method for i in api.requests], ['PUT', 'DELETE'])
+        self.assertEqual(relations.key_index('Code'), {'2': 'new'})
+        relations.forget(['NEW'])  # created by upsert()
+        self.assertEqual(relations.key_index('Code'), {})
+
+        self.assertRaises(
+            ValueError, relations.upsert, 'Code', [{'Code': '3'}] * 2)
+
+    def test_parse_dates(self):
+        created = '/Date(1516741035800)/'
+        api = RecordingApi(
+            *[[{'ID': 'a', 'Created': created}] for i in range(3)])
+        relations = Relations(api)
+        self.assertEqual(relations.all()[0]['Created'], created)
+
+        relations.parse_dates = True
+        self.assertEqual(
+            relations.all()[0]['Created'],
+            datetime(2018, 1, 23, 20, 57, 15, 800000))
+
+        # Compact records decode when the field is read.
+        relations.compact_records = True
+        record = relations.all()[0]
+        self.assertEqual(record._1, created)
+        self.assertEqual(
+            record.Created, datetime(2018, 1, 23, 20, 57, 15, 800000))
+        self.assertEqual(record._1, record['Created'])
+
+    def test_parse_decimals(self):
+        api = RecordingApi()
+        invoices = Invoices(api)
+        invoices.all()
+        self.assertIsNone(api.requests[-1].decoder)
+
+        invoices.parse_decimals = True
+        invoices.all()
+        self.assertEqual(
+            api.requests[-1].decoder.decimal_fields,
+            set(['AmountDC', 'AmountFC', 'VATAmountDC', 'VATAmountFC']))
+
+        # An explicit decoder wins.
+        invoices.filter(decoder=json.JSONDecoder())
+        self.assertIs(type(api.requests[-1].decoder), json.JSONDecoder)
+
+        # The lines are decoded like the invoice.
+        api.results = [
+            [{'EntryID': 'a', 'SalesEntryLines': {
+                '__deferred': {'uri': 'https://x/SalesEntryLines'}}}],
+            []]
+        invoices.get(invoice_number='1')
+        self.assertEqual(
+            api.requests[-1].resource, 'https://x/SalesEntryLines')
+        self.assertIs(api.requests[-1].decoder, api.requests[-2].decoder)
+
+    def test_sync(self):
+        api = RecordingApi(
+            [{'Timestamp': 5, 'ID': 'a'}, {'Timestamp': 7, 'ID': 'b'}],
+            [{'Timestamp': 9, 'ID': 'c'}])
+        api.storage = ApiTestCase.MemoryStorage(server_port=0)
+        accounts = SyncAccounts(api)
+        self.assertEqual(accounts.get_cursor(), 1)
+
+        applied = []
+        self.assertEqual(accounts.sync(applied.append, select='ID,Code'), 3)
+        self.assertEqual(
+            [[i['ID'] for i in page] for page in applied], [['a', 'b'], ['c']])
+        self.assertEqual(accounts.get_cursor(), 9)
+        self.assertEqual(api.storage.get_sync_timestamp(
+            1, 'sync/CRM/Accounts'), 9)
+        self.assertEqual(unquote(api.requests[-1].resource), (
+            'sync/CRM/Accounts?$select=Timestamp,ID,Code'
+            '&$filter=Timestamp gt 1'))
+        # Unlimited, instead of stopping at the iteration_limit.
+        self.assertIsInstance(api.requests[-1].limits, Limits)
+
+        # The cursor only moves after the page was applied.
+        def fail(records):
+            raise ValueError('boom')
+        api.results = [[{'Timestamp': 11, 'ID': 'a'}]]
+        self.assertRaises(ValueError, accounts.sync, fail)
+        self.assertEqual(accounts.get_cursor(), 9)
+        self.assertIn('Timestamp gt 9', unquote(api.requests[-1].resource))
+
+        accounts.reset_cursor()
+        self.assertEqual(accounts.get_cursor(), 1)
+
+    def test_sync_named(self):
+        api = RecordingApi([{'Timestamp': 5, 'ID': 'a'}])
+        api.storage = ApiTestCase.MemoryStorage(server_port=0)
+        accounts = SyncAccounts(api)
+        accounts.set_cursor(3)
+
+        # Every consumer has its own cursor.
+        self.assertEqual(accounts.sync(list, name='crm'), 1)
+        self.assertEqual(accounts.get_cursor('crm'), 5)
+        self.assertEqual(accounts.get_cursor(), 3)
+        self.assertEqual(api.storage.get_sync_timestamp(
+            1, 'sync/CRM/Accounts#crm'), 5)
+
+        # Filtered changes must not move a shared cursor.
+        self.assertRaises(
+            ValueError, accounts.sync, list, filter=Q(Status='C'))
+        api.results = [[]]
+        self.assertEqual(
+            accounts.sync(list, name='customers', filter=Q(Status='C')), 0)
+        self.assertIn(
+            "Status eq 'C' and Timestamp gt 1",
+            unquote(api.requests[-1].resource))
+
+    def test_sync_deleted(self):
+        api = RecordingApi(
+            [{'ID': 'A', 'Code': '1'}, {'ID': 'b', 'Code': '2'}])
+        api.storage = ApiTestCase.MemoryStorage(server_port=0)
+        relations = Relations(api)
+        relations.key_index('Code')
+        relations.cache = MemoryCache()
+        relations.cache.set('1/crm/Accounts?$select=ID', [{'ID': 'a'}], 60)
+
+        api.results = [
+            [{'Timestamp': 3, 'EntityKey': 'a', 'EntityType': 2},
+             {'Timestamp': 4, 'EntityKey': 'b', 'EntityType': 9}]]
+
+        syncdeleted = SyncDeleted(api)
+        self.assertEqual(syncdeleted.apply_tombstones([relations]), 2)
+        self.assertEqual(relations._key_indexes[(1, 'Code')], {'2': 'b'})
+        self.assertIsNone(relations.cache.get('1/crm/Accounts?$select=ID'))
+        # Its own cursor: other consumers don't take the deletions.
+        self.assertEqual(syncdeleted.get_cursor('tombstones'), 4)
+        self.assertEqual(syncdeleted.get_cursor(), 1)
+        self.assertRaises(
+            ValueError, syncdeleted.apply_tombstones, [VatCodes(api)])
+
+    def test_select_advisor(self):
+        api = RecordingApi(
+            [{'__metadata': {}, 'ID': 'a', 'Code': '1', 'Name': 'ACME',
+              'City': 'Delft'}],
+            [{'ID': 'b', 'Code': '2', 'Name': 'Daffy', 'City': 'Ede'}],
+            [{'ID': 'c', 'Code': '3', 'Name': 'Foo', 'City': 'Ede'}])
+        relations = Relations(api)
+        relations.select_advisor = advisor = SelectAdvisor(
+            skip=('exactonline.api.',))  # count this file as call site
+
+        for relation in relations.all():
+            self.assertEqual(relation['Name'], 'ACME')
+            self.assertEqual(relation.get('Nope'), None)
+        relation = relations.all()[0]
+        self.assertEqual(dict(relation)['ID'], 'b')  # reads everything
+
+        relations.compact_records = True
+        self.assertEqual(relations.all()[0].Code, '3')
+
+        first, second, third = advisor.report()
+        self.assertIn('api_test.py', first.call_site)
+        self.assertEqual(first.resource, 'crm/Accounts')
+        self.assertEqual((first.calls, first.records), (1, 1))
+        self.assertEqual(first.fields, ('ID', 'Code', 'Name', 'City'))
+        self.assertEqual(first.select, 'Name')
+        self.assertEqual(second.select, 'ID,Code,Name,City')
+        self.assertEqual(third.select, 'Code')
+        self.assertIn("read 1 of 4 fields\n    select='Name'", str(first))
+
+        # Nothing read: the key is enough.
+        relations.all()
+        self.assertEqual(advisor.report()[-1].select, 'ID')
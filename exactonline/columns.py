@@ -0,0 +1,188 @@
+# vim: set ts=8 sw=4 sts=4 et ai tw=79:
+"""
+Fetch records as columns, for reporting and aggregation.
+
+Instead of a list of dicts, you get a dict of field to column, built
+one page at a time:
+
+    columns = api.receivables.to_columns(select='AccountId,Amount,DueDate')
+    columns['Amount']  # array([12.5, 100.0, ...])
+
+    for batch in api.invoices.iter_batches(select='OrderedBy,AmountDC'):
+        ...  # one dict of columns per page
+
+If NumPy is installed, the columns are NumPy arrays:
+
+  - numbers (and booleans, as 1.0 and 0.0) are float64, with nan for
+    null. Amounts decoded as Decimal become float64 as well, so keep
+    the records if you need exact sums;
+  - dates are datetime64[ms], with NaT for null;
+  - everything else (strings, mostly) is an object array.
+
+The kind of a column is taken from the manager's decimal_fields and
+date_fields, or else from the first non-null value of the field. It is
+the same for all pages.
+
+Without NumPy, the columns are lists, with the date_fields decoded.
+
+Strings are interned per call: a column with the same AccountId for
+every invoice of an account holds that string only once. That keeps
+the columns small and makes grouping on them cheap, for example:
+
+    import numpy
+    keys, idx = numpy.unique(columns['AccountId'], return_inverse=True)
+    totals = numpy.bincount(idx, weights=columns['Amount'])
+
+This file is part of the Exact Online REST API Library in Python
+(EORALP), licensed under the LGPLv3+.
+Copyright (C) 2021 Walter Doekes, OSSO B.V.
+"""
+from datetime import datetime
+from decimal import Decimal
+
+from .dates import decode_date
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+NUMBERS = (int, float, Decimal)  # and bool, which is an int
+
+# The kinds of columns.
+DATE = 'date'
+NUMBER = 'number'
+OTHER = 'other'
+
+
+def iter_batches(manager, select=None, **kwargs):
+    """
+    Yield the results of manager.filter(**kwargs) one page at a time,
+    as dict of field to column. The fields are taken from the $select,
+    or from the first record.
+
+    The kind of a column is decided once per field. Until a field has
+    had a value, its columns hold None (in object arrays).
+    """
+    kinds = _declared_kinds(manager)
+    strings = {}  # intern table, shared by the batches
+
+    for fields, values in _raw_batches(manager, select, kwargs):
+        batch = {}
+        for field in fields:
+            kind = kinds.get(field) or _value_kind(values[field])
+            if kind is not None:
+                kinds[field] = kind
+            batch[field] = _convert(values[field], kind or OTHER, strings)
+        yield batch
+
+
+def to_columns(manager, select=None, **kwargs):
+    """
+    Return all results of manager.filter(**kwargs) as dict of field to
+    column. See iter_batches(). Values of a field that come before its
+    first non-null value are converted once its kind is known, so a
+    column has a single dtype.
+    """
+    kinds = _declared_kinds(manager)
+    strings = {}
+    parts = {}  # field => converted columns
+    pending = {}  # field => values, while we don't know the kind
+    fields = select.split(',') if select else []  # when there are no rows
+
+    for batch_fields, values in _raw_batches(manager, select, kwargs):
+        fields = batch_fields
+        for field in fields:
+            kind = kinds.get(field) or _value_kind(values[field])
+            if kind is None:
+                pending.setdefault(field, []).extend(values[field])
+                continue
+            kinds[field] = kind
+            parts.setdefault(field, []).append(_convert(
+                pending.pop(field, []) + values[field], kind, strings))
+
+    ret = {}
+    for field in fields:
+        columns = parts.get(field, [])
+        if field in pending or not columns:
+            # Only nulls (or nothing at all).
+            columns.append(_convert(
+                pending.get(field, []), kinds.get(field, OTHER), strings))
+        ret[field] = _concatenate(columns)
+    return ret
+
+
+def _raw_batches(manager, select, kwargs):
+    """
+    Yield the fields and a dict of field to values, per page.
+    """
+    fields = None
+    if select:
+        kwargs['select'] = select
+        fields = select.split(',')
+
+    for page in manager.filter(pages=True, **kwargs):
+        records = list(page)
+        if not records:
+            continue
+        if fields is None:
+            # Skip __metadata and friends.
+            fields = [i for i in records[0] if not i.startswith('__')]
+        yield fields, dict(
+            (field, [i.get(field) for i in records]) for field in fields)
+
+
+def _declared_kinds(manager):
+    kinds = dict((i, NUMBER) for i in manager.decimal_fields)
+    kinds.update((i, DATE) for i in manager.date_fields)
+    return kinds
+
+
+def _value_kind(values):
+    """
+    Return the kind of the first non-null value, or None if there is
+    none.
+    """
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, NUMBERS):
+            return NUMBER
+        if isinstance(value, datetime) or (
+                isinstance(value, str) and value.startswith('/Date(')):
+            return DATE
+        return OTHER
+    return None
+
+
+def _convert(values, kind, strings):
+    if kind == DATE:
+        values = [decode_date(i) for i in values]
+        if numpy is None:
+            return values
+        return numpy.array(values, dtype='datetime64[ms]')
+
+    if kind == NUMBER:
+        if numpy is None:
+            return values
+        return numpy.array(
+            [numpy.nan if i is None else float(i) for i in values],
+            dtype='float64')
+
+    values = [
+        strings.setdefault(i, i) if isinstance(i, str) else i
+        for i in values]
+    if numpy is None:
+        return values
+    ret = numpy.empty(len(values), dtype=object)
+    ret[:] = values
+    return ret
+
+
+def _concatenate(columns):
+    if numpy is None:
+        ret = []
+        for column in columns:
+            ret.extend(column)
+        return ret
+    return numpy.concatenate(columns)
@@ -0,0 +1,91 @@
+# vim: set ts=8 sw=4 sts=4 et ai tw=79:
+"""
+Column tests.
+
+This file is part of the Exact Online REST API Library in Python
+(EORALP), licensed under the LGPLv3+.
+Copyright (C) 2021 Walter Doekes, OSSO B.V.
+"""
+from datetime import datetime
+from decimal import Decimal
+from unittest import TestCase, skipIf
+
+from . import columns
+from .api.receivables import Receivables
+from .api_test import RecordingApi
+
+
+class ColumnsTestCase(TestCase):
+    def get_receivables(self):
+        return Receivables(RecordingApi(
+            [{'__metadata': {}, 'AccountId': 'a', 'Amount': 10,
+              'DueDate': '/Date(1516741035800)/'},
+             {'__metadata': {}, 'AccountId': 'b', 'Amount': 2.5,
+              'DueDate': None}],
+            [{'__metadata': {}, 'AccountId': 'a', 'Amount': Decimal('1.5'),
+              'DueDate': '/Date(1516741035800)/'}]))
+
+    @skipIf(columns.numpy is not None, 'NumPy is installed')
+    def test_lists(self):
+        receivables = self.get_receivables()
+        batches = list(receivables.iter_batches())
+        self.assertEqual(len(batches), 2)
+        self.assertEqual(
+            batches[0], {
+                'AccountId': ['a', 'b'], 'Amount': [10, 2.5],
+                'DueDate': [datetime(2018, 1, 23, 20, 57, 15, 800000), None]})
+
+        result = self.get_receivables().to_columns(select='AccountId,Amount')
+        self.assertEqual(result, {
+            'AccountId': ['a', 'b', 'a'],
+            'Amount': [10, 2.5, Decimal('1.5')]})
+
+    @skipIf(columns.numpy is None, 'NumPy is not installed')
+    def test_numpy(self):
+        numpy = columns.numpy
+        result = self.get_receivables().to_columns(
+            select='AccountId,Amount,DueDate')
+        self.assertEqual(result['Amount'].dtype, numpy.float64)
+        self.assertEqual(result['Amount'].sum(), 14.0)
+        self.assertEqual(result['AccountId'].dtype, object)
+        self.assertEqual(list(result['AccountId']), ['a', 'b', 'a'])
+        self.assertEqual(
+            str(result['DueDate'].dtype), 'datetime64[ms]')
+        self.assertTrue(numpy.isnat(result['DueDate'][1]))
+
+    def test_interned(self):
+        # Equal, but not the same string (as when decoded from JSON).
+        first, second = ''.join(['ac', 'me']), ''.join(['acm', 'e'])
+        self.assertIsNot(first, second)
+        receivables = Receivables(RecordingApi(
+            [{'AccountId': first}], [{'AccountId': second}]))
+        account_ids = list(receivables.to_columns()['AccountId'])
+        self.assertEqual(account_ids, ['acme', 'acme'])
+        self.assertIs(account_ids[0], account_ids[1])
+
+    def test_empty(self):
+        receivables = Receivables(RecordingApi())
+        result = receivables.to_columns(select='AccountId,DueDate')
+        self.assertEqual(sorted(result), ['AccountId', 'DueDate'])
+        self.assertEqual(len(result['AccountId']), 0)
+        self.assertEqual(receivables.to_columns(), {})
+
+    def test_null_first_page(self):
+        # The kind comes from the first value, whatever page it is on.
+        receivables = Receivables(RecordingApi(
+            [{'AccountId': None, 'Rate': None, 'Amount': None}],
+            [{'AccountId': 'a', 'Rate': 3, 'Amount': None},
+             {'AccountId': None, 'Rate': True, 'Amount': 1}]))
+        result = receivables.to_columns()
+        self.assertEqual(list(result['AccountId']), [None, 'a', None])
+        if columns.numpy is None:
+            self.assertEqual(result['Rate'], [None, 3, True])
+            return
+
+        numpy = columns.numpy
+        for field in ('Rate', 'Amount'):
+            self.assertEqual(result[field].dtype, numpy.float64)
+        self.assertEqual(result['AccountId'].dtype, object)
+        self.assertTrue(numpy.isnan(result['Rate'][0]))
+        self.assertEqual(list(result['Rate'][1:]), [3.0, 1.0])
+        self.assertEqual(numpy.isnan(result['Amount']).sum(), 2)
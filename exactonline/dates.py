@@ -0,0 +1,79 @@
+# vim: set ts=8 sw=4 sts=4 et ai tw=79:
+"""
+Decode the .NET JSON dates that Exact Online returns.
+
+Dates and datetimes are sent as milliseconds since the epoch, with an
+optional UTC offset:
+
+    /Date(1516741035800)/
+    /Date(1516741035800+0100)/
+
+They are decoded to naive datetimes (in the given offset, if any). The
+same values show up over and over (think dates at midnight), so the
+decoded values are cached.
+
+Managers with parse_dates set decode their date_fields: dicts in a
+single pass over those columns, compact records (exactonline.records)
+only when the field is first read.
+
+This file is part of the Exact Online REST API Library in Python
+(EORALP), licensed under the LGPLv3+.
+Copyright (C) 2018-2021 Walter Doekes, OSSO B.V.
+"""
+import re
+
+from datetime import datetime, timedelta
+
+try:
+    from functools import lru_cache
+except ImportError:  # python2
+    def lru_cache(maxsize):
+        return (lambda func: func)
+
+EPOCH = datetime(1970, 1, 1)
+
+_JSON_DATE = re.compile(r'^/Date\((-?\d+)(?:([+-])(\d\d)(\d\d))?\)/$')
+
+
+@lru_cache(maxsize=8192)
+def parse_json_date(value):
+    """
+    Return the /Date(...)/ value as datetime. Raises ValueError if it
+    isn't one.
+    """
+    match = _JSON_DATE.match(value)
+    if not match:
+        raise ValueError('Not a .NET JSON date: %r' % (value,))
+
+    milliseconds, sign, hh, mm = match.groups()
+    milliseconds = int(milliseconds)
+    if sign:
+        offset = (int(hh) * 60 + int(mm)) * 60000
+        milliseconds += (offset if sign == '+' else -offset)
+    return EPOCH + timedelta(milliseconds=milliseconds)
+
+
+def decode_date(value):
+    """
+    Return the value as datetime if it is a /Date(...)/ string, or as is
+    otherwise (None, or already decoded).
+    """
+    if isinstance(value, str) and value.startswith('/Date('):
+        return parse_json_date(value)
+    return value
+
+
+def decode_dates(records, fields):
+    """
+    Decode the fields of the records in place, one column at a time.
+    Iterators (streamed pages) are decoded as they are consumed.
+    """
+    if not isinstance(records, list):
+        return (decode_dates([i], fields)[0] for i in records)
+
+    for field in fields:
+        for record in records:
+            value = record.get(field)
+            if value is not None:
+                record[field] = decode_date(value)
+    return records
@@ -0,0 +1,48 @@
+# vim: set ts=8 sw=4 sts=4 et ai tw=79:
+"""
+.NET JSON date tests.
+
+This file is part of the Exact Online REST API Library in Python
+(EORALP), licensed under the LGPLv3+.
+Copyright (C) 2021 Walter Doekes, OSSO B.V.
+"""
+from datetime import datetime
+from unittest import TestCase
+
+from .dates import decode_date, decode_dates, parse_json_date
+
+
+class DatesTestCase(TestCase):
+    def test_parse(self):
+        self.assertEqual(
+            parse_json_date('/Date(1516741035800)/'),
+            datetime(2018, 1, 23, 20, 57, 15, 800000))
+        self.assertEqual(
+            parse_json_date('/Date(1516741035800+0130)/'),
+            datetime(2018, 1, 23, 22, 27, 15, 800000))
+        self.assertEqual(
+            parse_json_date('/Date(1516741035800-0100)/'),
+            datetime(2018, 1, 23, 19, 57, 15, 800000))
+        self.assertEqual(
+            parse_json_date('/Date(-86400000)/'), datetime(1969, 12, 31))
+        self.assertRaises(ValueError, parse_json_date, '2018-01-23')
+
+    def test_decode(self):
+        self.assertIsNone(decode_date(None))
+        self.assertEqual(decode_date('Name'), 'Name')
+        self.assertIs(
+            decode_date('/Date(0)/'), decode_date('/Date(0)/'))  # cached
+
+    def test_decode_dates(self):
+        records = [
+            {'Created': '/Date(0)/', 'EndDate': None, 'Name': '/Date(0)/'},
+            {'Created': '/Date(86400000)/'}]
+        ret = decode_dates(records, ('Created', 'EndDate'))
+        self.assertIs(ret, records)
+        self.assertEqual(records, [
+            {'Created': datetime(1970, 1, 1), 'EndDate': None,
+             'Name': '/Date(0)/'},
+            {'Created': datetime(1970, 1, 2)}])
+
+        ret = decode_dates(iter([{'Created': '/Date(0)/'}]), ('Created',))
+        self.assertEqual(list(ret), [{'Created': datetime(1970, 1, 1)}])
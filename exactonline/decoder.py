@@ -0,0 +1,174 @@
+# vim: set ts=8 sw=4 sts=4 et ai tw=79:
+"""
+JSON decoder with options to shrink the decoded records.
+
+Every record carries a __metadata dict with a long uri, and every
+navigation property (BankAccounts, SalesEntryLines, ...) is returned as
+a {"__deferred": {"uri": ...}} block. For wide entities, these make up a
+large share of the memory. The Decoder drops them while parsing, so they
+never end up in your caches.
+
+Records from the same division also repeat the same strings over and
+over: keys, currencies, VAT codes, ledger GUIDs, creator names. With
+intern set, the Decoder shares identical keys and (short) string values
+between all records it decodes.
+
+Amounts are JSON numbers, which become floats. With decimal_fields set,
+those fields are decoded straight to Decimal instead, without passing
+through float.
+
+Usage:
+
+    from exactonline.decoder import Decoder
+
+    # For every call on a manager:
+    api.relations.decoder = Decoder(metadata='strip')
+
+    # Or for a single call:
+    api.relations.filter(decoder=Decoder(metadata='guid'))
+
+    # Share strings between all cached relations.
+    api.relations.decoder = Decoder(metadata='strip', intern=True)
+
+    # Exact amounts.
+    api.invoices.decoder = Decoder(decimal_fields=('AmountDC', 'AmountFC'))
+
+Note that Invoices.get() and Quotations.get() use the __deferred uri to
+fetch the lines. With metadata stripped, the lines are not fetched.
+
+This file is part of the Exact Online REST API Library in Python
+(EORALP), licensed under the LGPLv3+.
+Copyright (C) 2021 Walter Doekes, OSSO B.V.
+"""
+import json
+import re
+
+from decimal import Decimal
+
+METADATA_MODES = ('keep', 'strip', 'guid')
+
+_GUID_IN_URI = re.compile(r"\(guid'([^']*)'\)$")
+
+
+def guid_from_uri(uri):
+    """
+    Return the GUID from a resource uri, like
+    https://start.exactonline.nl/api/v1/1/crm/Accounts(guid'1234-...')
+    or None if there is none.
+    """
+    match = _GUID_IN_URI.search(uri or '')
+    return match and match.group(1)
+
+
+class Decoder(json.JSONDecoder):
+    """
+    JSONDecoder that post-processes the objects while parsing.
+
+    metadata:
+      - 'keep': leave __metadata and __deferred blocks alone (default);
+      - 'strip': drop __metadata and all __deferred blocks;
+      - 'guid': like strip, but replace __metadata with the record GUID
+        taken from its uri (or None).
+
+    intern: share identical keys and string values of at most
+      intern_max_length characters between the decoded objects. The
+      intern table lives as long as the decoder and holds at most
+      intern_max_entries strings; after that, only known strings are
+      shared.
+
+    decimal_fields: decode the numbers in these fields to Decimal. The
+      other fractional numbers stay floats. Numbers in an array follow
+      the field that holds the array.
+    """
+    def __init__(self, metadata='keep', intern=False, intern_max_length=128,
+                 intern_max_entries=100000, decimal_fields=(), **kwargs):
+        if metadata not in METADATA_MODES:
+            raise ValueError('Unknown metadata mode %r' % (metadata,))
+        self.metadata = metadata
+        self.intern = intern
+        self.intern_max_length = intern_max_length
+        self.intern_max_entries = intern_max_entries
+        self._interned = {}
+        self.decimal_fields = frozenset(decimal_fields)
+
+        if self.decimal_fields:
+            # We don't know the key here, so all fractions are Decimals
+            # at first; the object_pairs_hook turns the others back.
+            kwargs.setdefault('parse_float', Decimal)
+        if self._has_hook():
+            kwargs['object_pairs_hook'] = self.object_pairs_hook
+        super(Decoder, self).__init__(**kwargs)
+
+    def _has_hook(self):
+        return self.metadata != 'keep' or self.intern or self.decimal_fields
+
+    def object_pairs_hook(self, pairs):
+        if self.metadata != 'keep':
+            pairs = self._strip_metadata(pairs)
+        if self.decimal_fields:
+            pairs = self._decimals(pairs)
+        if self.intern:
+            pairs = self._intern_strings(pairs)
+        return dict(pairs)
+
+    def _decimals(self, pairs):
+        fields = self.decimal_fields
+        ret = []
+        for key, value in pairs:
+            type_ = type(value)
+            if type_ is Decimal:
+                if key not in fields:
+                    value = float(value)
+            elif type_ is int and key in fields:
+                value = Decimal(value)
+            elif type_ is list:
+                value = self._decimals_in_list(value, key in fields)
+            ret.append((key, value))
+        return ret
+
+    def _decimals_in_list(self, values, is_decimal):
+        ret = []
+        for value in values:
+            type_ = type(value)
+            if type_ is Decimal:
+                if not is_decimal:
+                    value = float(value)
+            elif type_ is int and is_decimal:
+                value = Decimal(value)
+            elif type_ is list:
+                value = self._decimals_in_list(value, is_decimal)
+            ret.append(value)
+        return ret
+
+    def _intern_strings(self, pairs):
+        interned = self._interned
+        max_length = self.intern_max_length
+        is_full = (len(interned) >= self.intern_max_entries)
+
+        ret = []
+        for key, value in pairs:
+            try:
+                key = interned[key]
+            except KeyError:
+                if not is_full:
+                    interned[key] = key
+            if type(value) is str and len(value) <= max_length:
+                try:
+                    value = interned[value]
+                except KeyError:
+                    if not is_full:
+                        interned[value] = value
+            ret.append((key, value))
+        return ret
+
+    def _strip_metadata(self, pairs):
+        # The {"__deferred": ...} objects have already been built when
+        # we see them; we drop them from their parent.
+        ret = []
+        for key, value in pairs:
+            if key == u'__metadata':
+                if self.metadata == 'guid':
+                    ret.append((key, guid_from_uri(value.get(u'uri'))))
+            elif not (type(value) is dict and u'__deferred' in value):
+                ret.append((key, value))
+        return ret
@@ -0,0 +1,78 @@
+# vim: set ts=8 sw=4 sts=4 et ai tw=79:
+"""
+Decoder tests.
+
+This file is part of the Exact Online REST API Library in Python
+(EORALP), licensed under the LGPLv3+.
+Copyright (C) 2021 Walter Doekes, OSSO B.V.
+"""
+import json
+from decimal import Decimal
+from unittest import TestCase
+
+from .decoder import Decoder
+from .jsonstream import ResultStream
+
+
+class DecoderTestCase(TestCase):
+    document = json.dumps({'d': {'results': [{
+        '__metadata': {
+            'uri': "https://x/api/v1/1/crm/Accounts(guid'1234-abcd')",
+            'type': 'Exact.Web.Api.Models.Account'},
+        'BankAccounts': {'__deferred': {
+            'uri': "https://x/api/v1/1/crm/Accounts(guid'1234-abcd')"
+                   "/BankAccounts"}},
+        'ID': '1234-abcd',
+        'Name': 'ACME',
+    }], '__next': 'https://x/next'}})
+
+    def test_keep(self):
+        self.assertEqual(
+            Decoder().decode(self.document), json.loads(self.document))
+
+    def test_strip(self):
+        decoded = Decoder(metadata='strip').decode(self.document)
+        self.assertEqual(decoded, {'d': {'results': [
+            {'ID': '1234-abcd', 'Name': 'ACME'}],
+            '__next': 'https://x/next'}})
+
+    def test_guid_streamed(self):
+        stream = ResultStream(
+            [self.document.encode('utf-8')], decoder=Decoder(metadata='guid'))
+        self.assertEqual(list(stream), [
+            {'__metadata': '1234-abcd', 'ID': '1234-abcd', 'Name': 'ACME'}])
+        self.assertEqual(stream.finish(), 'https://x/next')
+
+    def test_intern(self):
+        decoder = Decoder(intern=True, intern_max_length=4)
+        first = decoder.decode('{"Currency": "EUR", "Name": "ACME Inc."}')
+        second = decoder.decode('{"Currency": "EUR", "Name": "ACME Inc."}')
+        self.assertEqual(first, second)
+        self.assertIs(list(first)[0], list(second)[0])  # key
+        self.assertIs(first['Currency'], second['Currency'])
+        self.assertIsNot(first['Name'], second['Name'])  # too long
+
+    def test_decimal_fields(self):
+        decoder = Decoder(decimal_fields=('AmountDC', 'VATAmountDC'))
+        ret = decoder.decode(
+            '{"AmountDC": 0.1, "VATAmountDC": 21, "Quantity": 0.5, '
+            '"Lines": [{"AmountDC": 1.005}], "Values": [0.25, [1.5]], '
+            '"AmountFC": [0.5, 2]}')
+        self.assertEqual(ret, {
+            'AmountDC': Decimal('0.1'), 'VATAmountDC': Decimal(21),
+            'Quantity': 0.5, 'Lines': [{'AmountDC': Decimal('1.005')}],
+            'Values': [0.25, [1.5]], 'AmountFC': [0.5, 2]})
+        self.assertIs(type(ret['Quantity']), float)
+        self.assertIs(type(ret['VATAmountDC']), Decimal)
+        # In arrays, the numbers follow the field of the array.
+        self.assertIs(type(ret['Values'][0]), float)
+        self.assertIs(type(ret['Values'][1][0]), float)
+        self.assertIs(type(ret['AmountFC'][1]), int)
+
+        ret = Decoder(decimal_fields=('Amounts',)).decode(
+            '{"Amounts": [0.1, 2]}')
+        self.assertEqual(
+            [type(i) for i in ret['Amounts']], [Decimal, Decimal])
+
+    def test_bad_mode(self):
+        self.assertRaises(ValueError, Decoder, metadata='drop')
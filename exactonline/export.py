@@ -0,0 +1,143 @@
+# vim: set ts=8 sw=4 sts=4 et ai tw=79:
+"""
+Stream records from the API into NDJSON or CSV files.
+
+The records are written as soon as a page arrives, and the page is
+flushed before the next one is fetched. Memory use is bounded by a
+single page, regardless of the size of the division.
+
+Usage:
+
+    from exactonline.export import CsvWriter, NdjsonWriter, export, open_output
+
+    with open_output('relations.csv.gz') as fp:
+        export(api.relations, CsvWriter(fp), select='ID,Code,Name')
+
+    with open_output('invoices.ndjson', compress='xz') as fp:
+        export(api.invoices, NdjsonWriter(fp))
+
+This file is part of the Exact Online REST API Library in Python
+(EORALP), licensed under the LGPLv3+.
+Copyright (C) 2021 Walter Doekes, OSSO B.V.
+"""
+import bz2
+import csv
+import gzip
+import json
+import lzma
+
+from .records import Record
+
+
+COMPRESSORS = {
+    'bz2': bz2.open,
+    'gz': gzip.open,
+    'xz': lzma.open,
+}
+
+
+def open_output(filename, compress=None):
+    """
+    Open filename for writing text. If compress is unset, the
+    compression is taken from the extension (.bz2, .gz or .xz); other
+    extensions are not compressed. Pass 'none' to write uncompressed,
+    whatever the extension. Other values raise ValueError.
+    """
+    if compress is None:
+        open_ = COMPRESSORS.get(filename.rsplit('.', 1)[-1], open)
+    elif compress == 'none':
+        open_ = open
+    elif compress in COMPRESSORS:
+        open_ = COMPRESSORS[compress]
+    else:
+        raise ValueError('Unknown compression %r' % (compress,))
+    # The csv module wants to do its own newline handling.
+    return open_(filename, 'wt', encoding='utf-8', newline='')
+
+
+class ExportWriter(object):
+    """
+    Base class for the writers. Subclasses implement write().
+    """
+    def __init__(self, fp):
+        self.fp = fp
+
+    def start(self, fieldnames):
+        """
+        Called once before the first page. fieldnames holds the $select
+        fields, or None if there was no $select.
+        """
+        pass
+
+    def write_page(self, records):
+        """
+        Write and flush the records. Returns the number of records.
+        """
+        count = 0
+        for record in records:
+            self.write(record)
+            count += 1
+        self.fp.flush()
+        return count
+
+    def write(self, record):
+        raise NotImplementedError()
+
+
+class NdjsonWriter(ExportWriter):
+    """
+    Write one JSON object per line.
+    """
+    def write(self, record):
+        self.fp.write(json.dumps(
+            record, separators=(',', ':'), default=_json_default))
+        self.fp.write('\n')
+
+
+def _json_default(value):
+    if isinstance(value, Record):
+        return dict(value)
+    # Use str() for values JSON doesn't know, like dates and Decimals.
+    return str(value)
+
+
+class CsvWriter(ExportWriter):
+    """
+    Write CSV with a header row. The columns are taken from fieldnames,
+    from the $select, or from the first record -- in that order.
+    """
+    def __init__(self, fp, fieldnames=None, **fmtparams):
+        super(CsvWriter, self).__init__(fp)
+        self.fieldnames = fieldnames
+        self._writer = csv.writer(fp, **fmtparams)
+        self._header_written = False
+
+    def start(self, fieldnames):
+        if self.fieldnames is None:
+            self.fieldnames = fieldnames
+
+    def write(self, record):
+        if not self._header_written:
+            if self.fieldnames is None:
+                # Skip __metadata and friends.
+                self.fieldnames = [
+                    i for i in record if not i.startswith('__')]
+            self._writer.writerow(self.fieldnames)
+            self._header_written = True
+
+        self._writer.writerow([record.get(i) for i in self.fieldnames])
+
+
+def export(manager, writer, **kwargs):
+    """
+    Write all records from manager.filter(**kwargs) to the writer, one
+    page at a time. Returns the number of records written. The fields
+    follow the $select, or the manager's default_select.
+    """
+    select = kwargs.get('select', manager.default_select)
+    writer.start(select.split(',') if select else None)
+
+    count = 0
+    for page in manager.filter(pages=True, **kwargs):
+        count += writer.write_page(page)
+    return count
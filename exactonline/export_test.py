@@ -0,0 +1,81 @@
+# vim: set ts=8 sw=4 sts=4 et ai tw=79:
+"""
+Export writer tests.
+
+This file is part of the Exact Online REST API Library in Python
+(EORALP), licensed under the LGPLv3+.
+Copyright (C) 2021 Walter Doekes, OSSO B.V.
+"""
+import gzip
+import os
+
+from io import StringIO
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from .api.relations import Relations
+from .api_test import RecordingApi
+from .export import CsvWriter, NdjsonWriter, export, open_output
+
+
+class ExportTestCase(TestCase):
+    def get_relations(self):
+        return Relations(RecordingApi(
+            [{'__metadata': {'uri': 'x'}, 'Name': 'ACME', 'ID': 'a',
+              'Code': '1'}],
+            [{'__metadata': {'uri': 'y'}, 'Name': 'Daffy', 'ID': 'b',
+              'Code': '2'}]))
+
+    def test_ndjson(self):
+        fp = StringIO()
+        count = export(self.get_relations(), NdjsonWriter(fp))
+        self.assertEqual(count, 2)
+        self.assertEqual(fp.getvalue(), (
+            '{"__metadata":{"uri":"x"},"Name":"ACME","ID":"a","Code":"1"}\n'
+            '{"__metadata":{"uri":"y"},"Name":"Daffy","ID":"b","Code":"2"}\n'))
+
+    def test_ndjson_records(self):
+        relations = self.get_relations()
+        relations.compact_records = True
+        fp = StringIO()
+        export(relations, NdjsonWriter(fp), select='ID,Code')
+        self.assertEqual(fp.getvalue().split('\n')[0], (
+            '{"__metadata":{"uri":"x"},"Name":"ACME","ID":"a","Code":"1"}'))
+
+    def test_csv_select_order(self):
+        fp = StringIO()
+        export(self.get_relations(), CsvWriter(fp), select='ID,Code,Name')
+        self.assertEqual(
+            fp.getvalue(), 'ID,Code,Name\r\na,1,ACME\r\nb,2,Daffy\r\n')
+
+    def test_csv_default_select_order(self):
+        fp = StringIO()
+        export(self.get_relations(), CsvWriter(fp))
+        self.assertEqual(
+            fp.getvalue(), 'ID,Code,Name\r\na,1,ACME\r\nb,2,Daffy\r\n')
+
+    def test_csv_record_order(self):
+        # Without any $select, the first record decides.
+        relations = self.get_relations()
+        relations.default_select = None
+        fp = StringIO()
+        export(relations, CsvWriter(fp))
+        self.assertEqual(
+            fp.getvalue(), 'Name,ID,Code\r\nACME,a,1\r\nDaffy,b,2\r\n')
+
+    def test_open_output(self):
+        with TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, 'out.csv.gz')
+            with open_output(filename) as fp:
+                fp.write('a,b\r\n')
+            with gzip.open(filename, 'rt') as fp:
+                self.assertEqual(fp.read(), 'a,b\n')
+
+            filename = os.path.join(tmpdir, 'out.gz')
+            with open_output(filename, compress='none') as fp:
+                fp.write('plain')
+            with open(filename) as fp:
+                self.assertEqual(fp.read(), 'plain')
+
+            self.assertRaises(
+                ValueError, open_output, filename, compress='zip')
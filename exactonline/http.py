@@ -234,10 +234,15 @@ class ValidHTTPSHandler(request.HTTPSHandler):
         return self.do_open(class_, req)
 
 
-def http_req(method, url, data=None, opt=opt_default, limiter=None):
+def http_req(method, url, data=None, opt=opt_default, limiter=None,
+             stream=False):
     """
     Generic http request with user supplied method.
 
+    If stream is set, an iterator over the response body chunks is
+    returned instead of the body. HTTP errors are still raised right
+    away.
+
     We'll probably want to add a nice timeout here later too.
     """
     if method in ('DELETE', 'GET'):
@@ -249,7 +254,8 @@ def http_req(method, url, data=None, opt=opt_default, limiter=None):
             'No REST handler for method %s' % (method,))
 
     return _http_request(
-        url, method=method, data=_marshalled(data), opt=opt, limiter=limiter)
+        url, method=method, data=_marshalled(data), opt=opt, limiter=limiter,
+        stream=stream)
 
 
 def _marshalled(data):
@@ -286,7 +292,19 @@ def _update_ratelimiter_with_exactonline_headers(limiter, headers):
                 remaining=headers.get('x-ratelimit-minutely-remaining'))
 
 
-def _http_request(url, method=None, data=None, opt=None, limiter=None):
+def _iter_chunks(fp, size=65536):
+    try:
+        while True:
+            chunk = fp.read(size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        fp.close()
+
+
+def _http_request(url, method=None, data=None, opt=None, limiter=None,
+                  stream=False):
     # Check protocol.
     proto = url.split(':', 1)[0]
     if proto not in opt.protocols:
@@ -311,7 +329,10 @@ def _http_request(url, method=None, data=None, opt=None, limiter=None):
     try:
         fp = opener.open(req)
         # print fp.info()  # (temp, print headers)
-        response = fp.read()
+        if stream:
+            response = _iter_chunks(fp)  # closes fp when done
+        else:
+            response = fp.read()
     except request.HTTPError as exception:
         fp = exception.fp  # see finally clause
         exc_info = sys.exc_info()
@@ -348,7 +369,8 @@ def _http_request(url, method=None, data=None, opt=None, limiter=None):
                     response,
                     method or '(none)',
                     data)
-            fp.close()
+            if not stream:
+                fp.close()
 
     if exc_info:
         raise stored_exception  # exc_info[0], exc_info[1], exc_info[2]
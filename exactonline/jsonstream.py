@@ -0,0 +1,187 @@
+# vim: set ts=8 sw=4 sts=4 et ai tw=79:
+"""
+Incremental parser for result pages.
+
+A result page looks like this:
+
+    {"d": {"results": [{...}, {...}, ...], "__next": "https://..."}}
+
+The ResultStream reads such a document from an iterable of (byte)
+chunks and yields every element of "results" as soon as it is
+complete. The other members of "d" (like "__next") are collected in
+the envelope, which is complete once the results are exhausted.
+
+Usage:
+
+    stream = ResultStream(chunks)
+    for record in stream:
+        print(record)
+    next_url = stream.finish()
+
+This file is part of the Exact Online REST API Library in Python
+(EORALP), licensed under the LGPLv3+.
+Copyright (C) 2021 Walter Doekes, OSSO B.V.
+"""
+import codecs
+import json
+
+WHITESPACE = ' \t\n\r'
+
+
+class ResultStream(object):
+    """
+    Iterate over the results in a {"d": {"results": [...]}} document
+    while it is being read. Iterate only once.
+
+    Also handles the {"d": [...]} variant. If entity is set (for a
+    resource(guid'...') lookup), {"d": {"ID": ...}} yields the entity as
+    the only result.
+    """
+    def __init__(self, chunks, decoder=None, entity=False):
+        self._chunks = iter(chunks)
+        self._decoder = decoder or json.JSONDecoder()
+        self._entity = entity
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+        self._iter = self._parse()
+        self.envelope = {}  # the members of "d", except "results"
+        self.has_results = False
+        self.count = 0  # results yielded so far
+
+    def __iter__(self):
+        return self._iter
+
+    def finish(self):
+        """
+        Consume the remaining results and return the __next URL, or None
+        if this was the last page.
+        """
+        for record in self._iter:
+            pass
+        return self.envelope.get(u'__next')
+
+    def _parse(self):
+        for key in self._members():
+            if key != u'd':
+                raise ValueError(
+                    'Expected *only* "d" in response, got %r' % (key,))
+
+            char = self._peek()
+            if char == '[':
+                self.has_results = True
+                records = self._array()
+            elif char == '{':
+                records = self._parse_d()
+            else:
+                raise ValueError(
+                    'Expected *list* or *dict* in "d", got %r' % (
+                        self._value(),))
+
+            for record in records:
+                self.count += 1
+                yield record
+
+        if self._peek():
+            raise ValueError('Trailing data after JSON document')
+
+    def _parse_d(self):
+        members = {}
+        for key in self._members():
+            if key == u'results' and self._peek() == '[':
+                self.has_results = True
+                for record in self._array():
+                    yield record
+            else:
+                members[key] = self._value()
+
+        if self._entity and not self.has_results:
+            # No results, so "d" is the entity itself.
+            self.has_results = True
+            yield members
+        else:
+            self.envelope.update(members)
+
+    def _members(self):
+        """
+        Yield the keys of an object. The caller must consume the value.
+        """
+        self._expect('{')
+        if self._peek() == '}':
+            self._pos += 1
+            return
+        while True:
+            key = self._value()
+            self._expect(':')
+            yield key
+            char = self._peek()
+            self._pos += 1
+            if char == '}':
+                return
+            if char != ',':
+                raise ValueError('Expected "," or "}", got %r' % (char,))
+
+    def _array(self):
+        self._expect('[')
+        if self._peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self._value()
+            char = self._peek()
+            self._pos += 1
+            if char == ']':
+                return
+            if char != ',':
+                raise ValueError('Expected "," or "]", got %r' % (char,))
+
+    def _value(self):
+        self._peek()  # skip whitespace
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buf, self._pos)
+            except ValueError:
+                if self._eof:
+                    raise
+            else:
+                # A value at the end of the buffer may be incomplete
+                # (think numbers), unless there is no more data.
+                if end < len(self._buf) or self._eof:
+                    self._pos = end
+                    return value
+            self._fill()
+
+    def _expect(self, char):
+        found = self._peek()
+        if found != char:
+            raise ValueError('Expected %r, got %r' % (char, found))
+        self._pos += 1
+
+    def _peek(self):
+        """
+        Skip whitespace and return the next character, or '' at EOF.
+        """
+        while True:
+            while (self._pos < len(self._buf) and
+                    self._buf[self._pos] in WHITESPACE):
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if self._eof:
+                return ''
+            self._fill()
+
+    def _fill(self):
+        try:
+            chunk = next(self._chunks)
+        except StopIteration:
+            text = self._utf8.decode(b'', final=True)
+            self._eof = True
+        else:
+            if isinstance(chunk, bytes):
+                text = self._utf8.decode(chunk)
+            else:
+                text = chunk
+        self._buf = self._buf[self._pos:] + text
+        self._pos = 0
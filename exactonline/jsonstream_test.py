@@ -0,0 +1,59 @@
+# vim: set ts=8 sw=4 sts=4 et ai tw=79:
+"""
+Incremental parser tests.
+
+This file is part of the Exact Online REST API Library in Python
+(EORALP), licensed under the LGPLv3+.
+Copyright (C) 2021 Walter Doekes, OSSO B.V.
+"""
+import json
+from unittest import TestCase
+
+from .jsonstream import ResultStream
+
+
+class ResultStreamTestCase(TestCase):
+    def chunked(self, data, size):
+        data = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        return [data[i:(i + size)] for i in range(0, len(data), size)]
+
+    def test_results_and_next(self):
+        data = {'d': {'results': [
+            {'Name': u'Café €', 'Amount': 12345.678},
+            {'Name': 'Other', 'Amount': 7, 'Lines': [1, 2, {'x': None}]},
+        ], '__next': 'https://example.com/next'}}
+
+        for size in (1, 3, 1000):
+            stream = ResultStream(self.chunked(data, size))
+            self.assertEqual(list(stream), data['d']['results'])
+            self.assertEqual(stream.finish(), 'https://example.com/next')
+            self.assertTrue(stream.has_results)
+
+    def test_results_are_lazy(self):
+        data = {'d': {'results': [{'a': 1}, {'b': 2}]}}
+        chunks = iter(self.chunked(data, 4))
+        stream = ResultStream(chunks)
+        self.assertEqual(next(iter(stream)), {'a': 1})
+        self.assertNotEqual(list(chunks), [])  # not everything was read
+
+    def test_d_list_and_envelope(self):
+        stream = ResultStream(self.chunked({'d': [1, 22, 333]}, 2))
+        self.assertEqual(list(stream), [1, 22, 333])
+        self.assertIsNone(stream.finish())
+
+        stream = ResultStream(
+            self.chunked({'d': {'ID': 'x', 'Code': 1}}, 2), entity=True)
+        self.assertEqual(list(stream), [{'ID': 'x', 'Code': 1}])
+        self.assertEqual(stream.envelope, {})
+        self.assertIsNone(stream.finish())
+
+        # Without entity, that's not a result page.
+        stream = ResultStream(self.chunked({'d': {'ID': 'x'}}, 2))
+        self.assertEqual(list(stream), [])
+        self.assertFalse(stream.has_results)
+
+    def test_invalid(self):
+        stream = ResultStream([b'{"d": {"results": [{"a": 1}, {"b": '])
+        self.assertRaises(ValueError, list, stream)
+        stream = ResultStream([b'{"e": {}}'])
+        self.assertRaises(ValueError, list, stream)
@@ -10,9 +10,14 @@ import json
 import logging
 import sys
 
+from threading import Lock
 from time import sleep, time
 
 from .http import HTTPError, Options, opt_secure, http_req, binquote, urljoin
+from .jsonstream import ResultStream
+
+
+_json_decoder = json.JSONDecoder()
 
 
 logger = logging.getLogger(__name__)
@@ -31,6 +36,12 @@ def _json_safe(data):
     return data
 
 
+def _counted_chunks(chunks, limits):
+    for chunk in chunks:
+        limits.add_bytes(len(chunk))
+        yield chunk
+
+
 class RateLimiter(object):
     """
     Keep track of ratelimits as imposed by ExactOnline.
@@ -45,9 +56,12 @@ class RateLimiter(object):
 
     NOTE: ExactOnline keeps a timer _per_ division. But this limiter updates
     automatically, so that is not much of a problem.
+
+    The limiter may be shared by concurrent requests (see api.workers).
     """
     def __init__(self):
         self._reset_times = {}
+        self._lock = Lock()
 
     def backoff(self):
         """
@@ -86,7 +100,18 @@ class RateLimiter(object):
         until //= 1000  # store per second, not millisecond
         # minutely and daily might overlap. Should not be an issue if we
         # update() the shortest value last (first Daily, then Minutely).
-        self._reset_times[until] = (limit, remaining)
+        with self._lock:
+            self._reset_times[until] = (limit, remaining)
+
+    def remaining(self):
+        """
+        Return the lowest number of calls left in the current rate limit
+        windows, or None if we don't know.
+        """
+        with self._lock:
+            self._clean()
+            remaining = [i[1] for i in self._reset_times.values()]
+        return min(remaining) if remaining else None
 
     def _clean(self):
         now = int(time())
@@ -95,7 +120,11 @@ class RateLimiter(object):
                 del self._reset_times[key]
 
     def _should_wait(self):
-        self._clean()
+        with self._lock:
+            self._clean()
+            return self._should_wait_locked()
+
+    def _should_wait_locked(self):
         # 0.5s offset, copes with slight clock drift AND ensures we get a
         # non-zero wait right after a 429.
         now = int(time() - 0.5)
@@ -121,6 +150,10 @@ class RateLimiter(object):
 
 
 class ExactRawApi(object):
+    # Set this to parse GET responses while they are downloaded. rest()
+    # then returns a ResultStream instead of the decoded document.
+    stream_results = False
+
     def __init__(self, storage, **kwargs):
         super(ExactRawApi, self).__init__(**kwargs)
         self.storage = storage
@@ -224,6 +257,13 @@ class ExactRawApi(object):
             data = json.dumps(request.data)
 
         new_request = request.update(resource=url, data=data)
+        decoder = request.decoder or _json_decoder
+
+        if (request.method == 'GET' and self.stream_results and
+                not request.is_count):
+            return ResultStream(
+                self._rest_query(new_request, stream=True), decoder=decoder,
+                entity=request.entity)
 
         response = self._rest_query(new_request)
 
@@ -236,7 +276,7 @@ class ExactRawApi(object):
             decoded = None
         else:
             try:
-                decoded = json.loads(response)
+                decoded = decoder.decode(response)
             except ValueError:
                 raise ValueError(
                     'Expected valid JSON data for %s operation: '
@@ -245,7 +285,7 @@ class ExactRawApi(object):
 
         return decoded
 
-    def _rest_query(self, request):
+    def _rest_query(self, request, stream=False):
         self.limiter.backoff()
 
         token = self.storage.get_access_token()
@@ -261,15 +301,23 @@ class ExactRawApi(object):
         try:
             response = http_req(
                 request.method, request.resource, data=request.data,
-                opt=opt, limiter=self.limiter)
+                opt=opt, limiter=self.limiter, stream=stream)
         except HTTPError as e:
             if e.getcode() == 429 and self.limiter.backoff():
                 response = http_req(
                     request.method, request.resource, data=request.data,
-                    opt=opt, limiter=self.limiter)
+                    opt=opt, limiter=self.limiter, stream=stream)
             else:
                 raise
 
+        if request.limits:
+            if stream:
+                response = _counted_chunks(response, request.limits)
+            else:
+                request.limits.add_bytes(len(response))
+
+        if stream:
+            return response  # raw chunks, decoded by the ResultStream
         return _json_safe(response)
 
     def _set_tokens(self, jsondata):
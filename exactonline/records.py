@@ -0,0 +1,157 @@
+# vim: set ts=8 sw=4 sts=4 et ai tw=79:
+"""
+Compact records: a generated __slots__ class per set of fields.
+
+A record dict holds a hash table with all the (long) field names. The
+records of one query all have the same fields, so that table can be
+shared: a Record stores only the values, and its class knows the
+fields. That makes them several times smaller than dicts, which adds up
+in long-lived caches.
+
+    api.relations.compact_records = True
+    relation = api.relations.get(relation_code='123')
+    relation.Name == relation['Name']
+
+Records behave like (read-only size) mappings: record['Name'],
+record.get('Name'), dict(record) and record == {...} all work. You can
+change the values, but you cannot add fields.
+
+Fields can have a converter, which is applied to string values when
+they are first read. The managers use that to decode dates lazily (see
+exactonline.dates).
+
+This file is part of the Exact Online REST API Library in Python
+(EORALP), licensed under the LGPLv3+.
+Copyright (C) 2021 Walter Doekes, OSSO B.V.
+"""
+try:
+    from collections.abc import Mapping
+except ImportError:  # python2
+    from collections import Mapping
+
+_classes = {}  # (fields, converters) => Record subclass
+
+
+class _Converted(object):
+    """
+    Descriptor around a slot that converts str values on first access,
+    and stores the converted value.
+    """
+    __slots__ = ('slot', 'func')
+
+    def __init__(self, slot, func):
+        self.slot = slot
+        self.func = func
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = self.slot.__get__(instance)
+        if isinstance(value, str):
+            value = self.func(value)
+            self.slot.__set__(instance, value)
+        return value
+
+    def __set__(self, instance, value):
+        self.slot.__set__(instance, value)
+
+
+class Record(Mapping):
+    """
+    Base class for the generated record classes. See record_class().
+    """
+    __slots__ = ()
+    _fields = ()
+    _slots = {}  # field => member descriptor (or _Converted)
+
+    def __getitem__(self, key):
+        try:
+            slot = self._slots[key]
+        except KeyError:
+            raise KeyError(key)
+        return slot.__get__(self)
+
+    def __setitem__(self, key, value):
+        try:
+            slot = self._slots[key]
+        except KeyError:
+            raise KeyError('Cannot add %r to a record with fields %r' % (
+                key, self._fields))
+        slot.__set__(self, value)
+
+    def __iter__(self):
+        return iter(self._fields)
+
+    def __len__(self):
+        return len(self._fields)
+
+    def __contains__(self, key):
+        return key in self._slots
+
+    def __repr__(self):
+        return '<Record %r>' % (dict(self),)
+
+    def __reduce__(self):
+        # The generated classes cannot be found by name; rebuild them.
+        return (_rebuild, (self._fields, tuple(self.values())))
+
+    def values(self):
+        return [self[i] for i in self._fields]
+
+
+def record_class(fields, converters=()):
+    """
+    Return the Record subclass for this tuple of field names, and the
+    (field, func) converters. The classes are created once and then
+    reused.
+    """
+    key = (fields, converters)
+    try:
+        return _classes[key]
+    except KeyError:
+        pass
+
+    # Positional slot names: the fields need not be identifiers, and
+    # names like __metadata would get mangled.
+    namespace = {'__slots__': tuple('_%d' % (i,) for i in range(len(fields)))}
+    cls = type('Record', (Record,), namespace)
+    cls._fields = fields
+    cls._slots = dict(
+        (field, cls.__dict__['_%d' % (i,)]) for i, field in enumerate(fields))
+    for field, func in converters:
+        if field in cls._slots:
+            cls._slots[field] = _Converted(cls._slots[field], func)
+
+    # Attribute access by field name, straight to the slot.
+    for field, slot in cls._slots.items():
+        if not hasattr(cls, field):
+            setattr(cls, field, slot)
+
+    return _classes.setdefault(key, cls)
+
+
+def to_record(record, converters=()):
+    """
+    Return the dict as Record, or the record itself if it isn't a dict.
+    """
+    if type(record) is not dict:
+        return record
+    cls = record_class(tuple(record), converters)
+    ret = cls.__new__(cls)
+    for slot, value in zip(cls._slots.values(), record.values()):
+        slot.__set__(ret, value)
+    return ret
+
+
+def to_records(records, converters=()):
+    """
+    Convert a list of dicts to Records. Iterators (streamed pages) are
+    converted as they are consumed.
+    """
+    if isinstance(records, list):
+        return [to_record(i, converters) for i in records]
+    return (to_record(i, converters) for i in records)
+
+
+def _rebuild(fields, values):
+    return to_record(dict(zip(fields, values)))
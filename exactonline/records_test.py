@@ -0,0 +1,67 @@
+# vim: set ts=8 sw=4 sts=4 et ai tw=79:
+"""
+Compact record tests.
+
+This file is part of the Exact Online REST API Library in Python
+(EORALP), licensed under the LGPLv3+.
+Copyright (C) 2021 Walter Doekes, OSSO B.V.
+"""
+import pickle
+import sys
+from copy import deepcopy
+from unittest import TestCase
+
+from .records import Record, record_class, to_record, to_records
+
+
+class RecordTestCase(TestCase):
+    def get_dict(self):
+        return {
+            '__metadata': {'uri': 'x'}, 'ID': 'a', 'Code': '1',
+            'Name': 'ACME', 'keys': 'not a method'}
+
+    def test_mapping(self):
+        record = to_record(self.get_dict())
+        self.assertIsInstance(record, Record)
+        self.assertEqual(record, self.get_dict())
+        self.assertEqual(dict(record), self.get_dict())
+        self.assertEqual(list(record), list(self.get_dict()))
+        self.assertEqual(record['Name'], 'ACME')
+        self.assertEqual(record.Name, 'ACME')
+        self.assertEqual(record.get('Missing', 1), 1)
+        self.assertIn('__metadata', record)
+        self.assertNotIn('Missing', record)
+        self.assertEqual(record['keys'], 'not a method')
+        self.assertEqual(list(record.keys())[1], 'ID')
+
+    def test_set(self):
+        record = to_record(self.get_dict())
+        record['Name'] = 'Daffy'
+        self.assertEqual(record.Name, 'Daffy')
+        self.assertRaises(KeyError, record.__setitem__, 'Missing', 1)
+        self.assertRaises(AttributeError, setattr, record, 'Missing', 1)
+
+    def test_class_reuse(self):
+        first = to_record(self.get_dict())
+        second = to_record(self.get_dict())
+        self.assertIs(type(first), type(second))
+        self.assertIs(type(first), record_class(tuple(self.get_dict())))
+        self.assertIsNot(type(first), type(to_record({'ID': 'a'})))
+
+    def test_copy(self):
+        record = to_record(self.get_dict())
+        self.assertEqual(pickle.loads(pickle.dumps(record)), record)
+        copy = deepcopy(record)
+        copy['__metadata']['uri'] = 'y'
+        self.assertEqual(record['__metadata'], {'uri': 'x'})
+
+    def test_size(self):
+        record = to_record(self.get_dict())
+        self.assertLess(
+            sys.getsizeof(record) * 2, sys.getsizeof(self.get_dict()))
+
+    def test_to_records(self):
+        self.assertEqual(to_records([{'ID': 'a'}, 1]), [{'ID': 'a'}, 1])
+        records = to_records(iter([{'ID': 'a'}]))
+        self.assertNotIsInstance(records, list)
+        self.assertEqual(list(records), [{'ID': 'a'}])
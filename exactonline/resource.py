@@ -23,9 +23,16 @@ class _Resource(object):
         r2 = r.update(resource=('v1/' + r.resource))
 
     """
-    def __init__(self, resource, data=None):
+    # Which properties we have.
+    _PROPERTIES = ('data', 'decoder', 'entity', 'limits', 'resource')
+
+    def __init__(self, resource, data=None, decoder=None, limits=None,
+                 entity=False):
         self._resource = resource  # or "path" or "full url"
         self._data = data
+        self._decoder = decoder  # JSONDecoder for the response, optional
+        self._limits = limits  # api.limits.Limits for pagination, optional
+        self._entity = entity  # expect a single entity, not results
 
     def __repr__(self):
         return '%s(%r, %r)' % (self.method, self.resource, self.data)
@@ -42,10 +49,28 @@ class _Resource(object):
     def data(self):
         return self._data
 
+    @property
+    def decoder(self):
+        return self._decoder
+
+    @property
+    def limits(self):
+        return self._limits
+
+    @property
+    def entity(self):
+        # A resource(guid'...') returns {"d": {...the entity...}}.
+        return self._entity
+
+    @property
+    def is_count(self):
+        # A resource/$count returns a bare number, not a {"d": ...}.
+        return self._resource.split('?', 1)[0].endswith('/$count')
+
     def update(self, **kwargs):
         new_data = dict(**kwargs)
 
-        for prop in ('data', 'resource'):
+        for prop in self._PROPERTIES:
             if prop not in new_data:
                 new_data[prop] = getattr(self, prop)
 
@@ -158,6 +158,18 @@ class ExactOnlineConfig(object):
     def set_refresh_token(self, value):
         self.set('transient', 'refresh_token', native_string(value))
 
+    # [sync]
+    # ; The cursors of the sync managers (see api.sync), per division
+    # ; and resource. These will be written to by this exactonline
+    # ; library. Timestamp 1 means: sync everything.
+
+    def get_sync_timestamp(self, division, resource):
+        return int(self.get_or_set_default(
+            'sync', '%s/%s' % (division, resource), '1'))
+
+    def set_sync_timestamp(self, division, resource, value):
+        self.set('sync', '%s/%s' % (division, resource), native_string(value))
+
     # ; aliases
 
     def get_refresh_url(self):
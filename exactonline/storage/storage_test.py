@@ -125,6 +125,14 @@ class IniStorageTestCase(TestCase):
             except OSError:
                 pass
 
+    def test_sync_timestamps(self):
+        config = IniStorage(StringIO())
+        self.assertEqual(config.get_sync_timestamp(1, 'sync/CRM/Accounts'), 1)
+        config.set_sync_timestamp(1, 'sync/CRM/Accounts', 12345678901)
+        self.assertEqual(
+            config.get_sync_timestamp(1, 'sync/CRM/Accounts'), 12345678901)
+        self.assertEqual(config.get_sync_timestamp(2, 'sync/CRM/Accounts'), 1)
+
     def test_get_and_set_must_be_string_types(self):
         # internals: we want str types inserted into set() and returned
         # from get(). Needed for clean py23 compatibility.